@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+_deps_kernels.py — integer graph kernels for zeropkg_deps (CSR form)
+
+The kernels only touch integer ids and caller-provided buffers, so the same
+source is compiled with numba @njit when numba is installed and otherwise runs
+as plain Python (buffers from new_buffer() are numpy arrays or lists).
+
+CSR layout: the neighbours of node u are indices[indptr[u]:indptr[u+1]].
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except Exception:
+    NUMBA_AVAILABLE = False
+
+if not NUMBA_AVAILABLE:
+    def njit(*args, **kwargs):
+        # no-op stand-in: @njit(cache=True) leaves the function as plain Python
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        def deco(f):
+            return f
+        return deco
+
+
+def new_buffer(n: int, fill: int = 0):
+    """Work buffer of n ints: an int32 array when numba can use it, else a list."""
+    if NUMBA_AVAILABLE:
+        return np.full(n, fill, dtype=np.int32)
+    return [fill] * n
+
+
+def to_list(buf, n: int):
+    """First n entries of a buffer as a Python list."""
+    if NUMBA_AVAILABLE:
+        return buf[:n].tolist()
+    return list(buf[:n])
+
+
+@njit(cache=True)
+def tarjan_csr(indptr, indices, n, dfn, low, on_stack, scc_id, stack, work_node, work_pos):
+    """
+    Iterative Tarjan SCC. dfn must be filled with -1; all buffers have length n.
+    Writes the component of each node to scc_id and returns the number of SCCs.
+    """
+    index = 0
+    n_scc = 0
+    sp = 0  # SCC stack top
+    wp = 0  # work stack top
+    for root in range(n):
+        if dfn[root] != -1:
+            continue
+        dfn[root] = index
+        low[root] = index
+        index += 1
+        stack[sp] = root
+        sp += 1
+        on_stack[root] = 1
+        work_node[wp] = root
+        work_pos[wp] = indptr[root]
+        wp += 1
+        while wp > 0:
+            u = work_node[wp - 1]
+            k = work_pos[wp - 1]
+            end = indptr[u + 1]
+            pushed = False
+            while k < end:
+                v = indices[k]
+                k += 1
+                if dfn[v] == -1:
+                    work_pos[wp - 1] = k
+                    dfn[v] = index
+                    low[v] = index
+                    index += 1
+                    stack[sp] = v
+                    sp += 1
+                    on_stack[v] = 1
+                    work_node[wp] = v
+                    work_pos[wp] = indptr[v]
+                    wp += 1
+                    pushed = True
+                    break
+                if on_stack[v] == 1 and dfn[v] < low[u]:
+                    low[u] = dfn[v]
+            if pushed:
+                continue
+            wp -= 1
+            if wp > 0:
+                p = work_node[wp - 1]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+            if low[u] == dfn[u]:
+                while True:
+                    sp -= 1
+                    w = stack[sp]
+                    on_stack[w] = 0
+                    scc_id[w] = n_scc
+                    if w == u:
+                        break
+                n_scc += 1
+    return n_scc
+
+
+@njit(cache=True)
+def kahn_csr(indptr, indices, rev_indptr, rev_indices, n, in_sub, indeg, order, level_end):
+    """
+    Level-by-level Kahn restricted to nodes with in_sub[u] == 1, dependencies first.
+    order (length n) receives the sorted ids; level_end[i] is the end offset of level i.
+    Returns (number of ordered nodes, number of levels).
+    """
+    tail = 0
+    for u in range(n):
+        if in_sub[u] == 0:
+            continue
+        c = 0
+        for k in range(indptr[u], indptr[u + 1]):
+            if in_sub[indices[k]] == 1:
+                c += 1
+        indeg[u] = c
+        if c == 0:
+            order[tail] = u
+            tail += 1
+    head = 0
+    n_levels = 0
+    while head < tail:
+        stop = tail
+        while head < stop:
+            u = order[head]
+            head += 1
+            for k in range(rev_indptr[u], rev_indptr[u + 1]):
+                v = rev_indices[k]
+                if in_sub[v] == 1:
+                    indeg[v] -= 1
+                    if indeg[v] == 0:
+                        order[tail] = v
+                        tail += 1
+        level_end[n_levels] = stop
+        n_levels += 1
+    return tail, n_levels
+
+
+@njit(cache=True)
+def reach_csr(indptr, indices, start, seen, out):
+    """
+    Breadth-first reachability from start; out doubles as the queue.
+    seen must be zeroed. Returns how many ids were written to out
+    (start itself only appears if it lies on a cycle).
+    """
+    tail = 0
+    head = 0
+    u = start
+    while True:
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if seen[v] == 0:
+                seen[v] = 1
+                out[tail] = v
+                tail += 1
+        if head >= tail:
+            break
+        u = out[head]
+        head += 1
+    return tail
+
+
+def kahn_csr_frontier(indptr, indices, rev_indptr, rev_indices, members):
+    """
+    Frontier-at-a-time Kahn with numpy (used when numpy is present but numba is not):
+    each level's dependents are gathered, decremented and filtered in C.
+    Returns the levels as lists of ids.
+    """
+    n = len(indptr) - 1
+    mask = np.zeros(n, dtype=bool)
+    mask[np.asarray(members, dtype=np.int64)] = True
+    # pending dependencies of each node inside the subset
+    src = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    keep = mask[src] & mask[indices]
+    indeg = np.bincount(src[keep], minlength=n)
+    frontier = np.flatnonzero(mask & (indeg == 0))
+    levels = []
+    while frontier.size:
+        levels.append(frontier.tolist())
+        starts = rev_indptr[frontier]
+        counts = rev_indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            break
+        # flat positions of every dependent of the frontier in rev_indices
+        pos = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        outs = rev_indices[pos]
+        outs = outs[mask[outs]]
+        np.subtract.at(indeg, outs, 1)
+        cand = np.unique(outs)
+        frontier = cand[indeg[cand] == 0]
+    return levels
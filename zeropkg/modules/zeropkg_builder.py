@@ -243,9 +243,11 @@ class ZeropkgBuilder:
                 # use tar via python tarfile for portability
                 import tarfile
                 with tarfile.open(str(artifact_path), "w:xz") as tf:
+                    # rglob already yields every entry: add each one non-recursively,
+                    # otherwise every directory re-walks (and re-adds) its whole subtree
                     for f in staging.rglob("*"):
                         arcname = f.relative_to(staging)
-                        tf.add(str(f), arcname=str(arcname))
+                        tf.add(str(f), arcname=str(arcname), recursive=False)
                 result["artifact"] = str(artifact_path)
             except Exception as e:
                 result["artifact_error"] = str(e)
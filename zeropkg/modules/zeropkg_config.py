@@ -158,6 +158,33 @@ def _deep_merge(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     return a
 
 # validate repo path heuristics
+def _find_suffix_below(root: Path, suffix: str) -> bool:
+    """
+    True if any subdirectory of root (at any depth) holds a file ending in suffix.
+    Breadth-first scandir walk: a ports tree (category/pkg/pkg.toml) answers within
+    the first few directories instead of after a full depth-first rglob of one branch.
+    """
+    queue = []
+    try:
+        with os.scandir(root) as it:
+            queue = [e.path for e in it if e.is_dir()]
+    except OSError:
+        return False
+    i = 0
+    while i < len(queue):
+        d = queue[i]
+        i += 1
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        queue.append(e.path)
+                    elif e.name.endswith(suffix) and e.is_file():
+                        return True
+        except OSError:
+            continue
+    return False
+
 def _validate_ports_root(path: Path) -> Tuple[bool, str]:
     """
     Returns (ok, reason) — ok True means path looks like a ports tree (best-effort).
@@ -173,17 +200,8 @@ def _validate_ports_root(path: Path) -> Tuple[bool, str]:
         dist = path / "distfiles"
         if dist.exists() and dist.is_dir():
             return True, "ok"
-        # find any .toml recursively up to depth 3
-        found = False
-        depth = 0
-        for p in path.iterdir():
-            if p.is_dir():
-                for f in p.rglob("*.toml"):
-                    found = True
-                    break
-            if found:
-                break
-        if found:
+        # find any .toml in the subdirectories
+        if _find_suffix_below(path, ".toml"):
             return True, "ok"
         # check for Makefile at top-level
         if any((path / n).exists() for n in ("Makefile", "mk")):
@@ -22,7 +22,7 @@ import time
 import tempfile
 import tarfile
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterable
 
 # Safe import logger/config (optional)
 def _safe_import(name: str):
@@ -55,6 +55,8 @@ DEFAULT_STATE_DIR.mkdir(parents=True, exist_ok=True)
 DEFAULT_DB_PATH = DEFAULT_STATE_DIR / "zeropkg.db"
 DEFAULT_SNAP_DIR = DEFAULT_STATE_DIR / "snapshots"
 DEFAULT_SNAP_DIR.mkdir(parents=True, exist_ok=True)
+# SQLite default limit for host parameters in a single statement
+SQLITE_MAX_VARS = 999
 
 # Simple in-memory cache structure
 class _SimpleCache:
@@ -109,6 +111,8 @@ class ZeroPKGDB:
             exists = self.db_path.exists()
             self._conn = sqlite3.connect(str(self.db_path), timeout=self._timeout, check_same_thread=False)
             self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.execute("PRAGMA temp_store=MEMORY;")
             self._conn.execute("PRAGMA foreign_keys=ON;")
             self._conn.row_factory = sqlite3.Row
             if not exists:
@@ -304,6 +308,46 @@ class ZeroPKGDB:
             cur = self._execute("SELECT name, version, size, installed_at FROM packages ORDER BY name")
             return [dict(r) for r in cur.fetchall()]
 
+    def installed_names(self) -> Set[str]:
+        """
+        Names of all installed packages, read straight off the cursor (name column only):
+        no per-row dict and no intermediate fetchall list, for callers that only test membership.
+        """
+        with self._lock:
+            cur = self._execute("SELECT name FROM packages")
+            return {r[0] for r in cur}
+
+    def get_packages_many(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch lookup of installed packages by name (one query per chunk of names
+        instead of one query per package). Returns {name: {name, version, size, installed_at}}
+        """
+        names = list(dict.fromkeys(names))
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(names), SQLITE_MAX_VARS):
+                chunk = names[i:i + SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                cur = self._execute(f"SELECT name, version, size, installed_at FROM packages WHERE name IN ({marks})", tuple(chunk))
+                for r in cur.fetchall():
+                    out[r["name"]] = dict(r)
+        return out
+
+    def installed_subset(self, names: Iterable[str]) -> Set[str]:
+        """
+        Which of names are installed, checked in the database (name-only IN batches)
+        so callers with a short candidate list do not materialize every package row.
+        """
+        names = list(dict.fromkeys(names))
+        out: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(names), SQLITE_MAX_VARS):
+                chunk = names[i:i + SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                cur = self._execute(f"SELECT name FROM packages WHERE name IN ({marks})", tuple(chunk))
+                out.update(r["name"] for r in cur.fetchall())
+        return out
+
     def find_revdeps(self, name: str) -> List[str]:
         """
         Return list of packages that depend on 'name'
@@ -312,6 +356,18 @@ class ZeroPKGDB:
             cur = self._execute("SELECT p.name FROM deps d JOIN packages p ON p.id = d.package_id WHERE d.depends_on = ? GROUP BY p.name", (name,))
             return [r["name"] for r in cur.fetchall()]
 
+    def reverse_deps_index(self) -> Dict[str, Set[str]]:
+        """
+        {dependency: {installed packages that depend on it}} from one pass over the
+        deps table, so callers answering many revdep/orphan questions need one query.
+        """
+        out: Dict[str, Set[str]] = {}
+        with self._lock:
+            cur = self._execute("SELECT d.depends_on AS dep, p.name AS name FROM deps d JOIN packages p ON p.id = d.package_id")
+            for r in cur.fetchall():
+                out.setdefault(r["dep"], set()).add(r["name"])
+        return out
+
     def get_orphaned_packages(self) -> List[str]:
         """
         Find packages that are not required by any other installed package (orphans).
@@ -335,32 +391,28 @@ class ZeroPKGDB:
         Returns report dict.
         """
         report = {"checked": 0, "errors": []}
+        # one join for every recorded file instead of a package lookup plus a files query per package
+        sql = "SELECT p.name AS name, f.path AS path, f.sha256 AS sha256 FROM files f JOIN packages p ON p.id = f.package_id"
         with self._lock:
             if package_name:
-                rows = [self._get_package_row(package_name)]
+                cur = self._execute(sql + " WHERE p.name = ? ORDER BY f.id", (package_name,))
             else:
-                cur = self._execute("SELECT name FROM packages")
-                rows = [self._get_package_row(r["name"]) for r in cur.fetchall()]
-            for row in rows:
-                if not row:
-                    continue
-                name = row["name"]
-                pkg_id = row["id"]
-                cur = self._execute("SELECT path, sha256 FROM files WHERE package_id = ?", (pkg_id,))
-                for frow in cur.fetchall():
-                    p = Path(frow["path"])
-                    expected = frow["sha256"]
-                    report["checked"] += 1
-                    try:
-                        if not p.exists():
-                            report["errors"].append({"pkg": name, "path": str(p), "error": "missing"})
-                            continue
-                        # compute sha256
-                        h = self._compute_sha256(p)
-                        if expected and h.lower() != expected.lower():
-                            report["errors"].append({"pkg": name, "path": str(p), "error": "sha_mismatch", "expected": expected, "got": h})
-                    except Exception as e:
-                        report["errors"].append({"pkg": name, "path": str(p), "error": str(e)})
+                cur = self._execute(sql + " ORDER BY p.id, f.id")
+            for frow in cur.fetchall():
+                name = frow["name"]
+                p = Path(frow["path"])
+                expected = frow["sha256"]
+                report["checked"] += 1
+                try:
+                    if not p.exists():
+                        report["errors"].append({"pkg": name, "path": str(p), "error": "missing"})
+                        continue
+                    # compute sha256
+                    h = self._compute_sha256(p)
+                    if expected and h.lower() != expected.lower():
+                        report["errors"].append({"pkg": name, "path": str(p), "error": "sha_mismatch", "expected": expected, "got": h})
+                except Exception as e:
+                    report["errors"].append({"pkg": name, "path": str(p), "error": str(e)})
         return report
 
     def _compute_sha256(self, path: Path) -> str:
@@ -381,6 +433,21 @@ class ZeroPKGDB:
             self._execute("INSERT INTO events(ts, type, level, package, payload_json) VALUES(?,?,?,?,?)", (ts, etype, level, package, payload_json), commit=True)
             _log_event(etype, f"{package or '-'}: {etype} {payload or {}}", level=level, metadata=payload)
 
+    def record_events_many(self, etype: str, events: List[Tuple[Optional[str], Optional[Dict[str, Any]]]], level: str = "INFO") -> None:
+        """
+        Record several events of one type in a single executemany/commit
+        instead of one transaction per event. events: [(package, payload), ...]
+        """
+        if not events:
+            return
+        ts = int(time.time())
+        rows = [(ts, etype, level, package, json.dumps(payload or {}, ensure_ascii=False)) for package, payload in events]
+        with self._lock:
+            self._conn.executemany("INSERT INTO events(ts, type, level, package, payload_json) VALUES(?,?,?,?,?)", rows)
+            self._conn.commit()
+            for package, payload in events:
+                _log_event(etype, f"{package or '-'}: {etype} {payload or {}}", level=level, metadata=payload)
+
     def query_events(self, limit: int = 100) -> List[Dict[str, Any]]:
         with self._lock:
             cur = self._execute("SELECT ts,type,level,package,payload_json FROM events ORDER BY ts DESC LIMIT ?", (limit,))
@@ -555,10 +622,26 @@ def list_installed_quick():
     db = _get_default_db()
     return db.list_installed_quick()
 
+def installed_names():
+    db = _get_default_db()
+    return db.installed_names()
+
+def get_packages_many(names: List[str]):
+    db = _get_default_db()
+    return db.get_packages_many(names)
+
+def installed_subset(names):
+    db = _get_default_db()
+    return db.installed_subset(names)
+
 def find_revdeps(name: str):
     db = _get_default_db()
     return db.find_revdeps(name)
 
+def reverse_deps_index():
+    db = _get_default_db()
+    return db.reverse_deps_index()
+
 def get_orphaned_packages():
     db = _get_default_db()
     return db.get_orphaned_packages()
@@ -567,6 +650,10 @@ def record_event(etype: str, level: str = "INFO", package: Optional[str] = None,
     db = _get_default_db()
     return db.record_event(etype, level, package, payload)
 
+def record_events_many(etype: str, events: List[Tuple[Optional[str], Optional[Dict[str, Any]]]], level: str = "INFO"):
+    db = _get_default_db()
+    return db.record_events_many(etype, events, level)
+
 # Basic CLI for quick introspection
 if __name__ == "__main__":
     import argparse, pprint
@@ -117,6 +117,9 @@ class Depclean:
         self.protected: Set[str] = set(self.cfg.get("depclean", {}).get("protected", []))
         self.max_workers = int(self.cfg.get("depclean", {}).get("max_workers", 4))
         self.auto_backup = bool(self.cfg.get("depclean", {}).get("backup", True))
+        # preview memo: (key, result, monotonic ts) — shared between find_orphan_candidates and execute
+        self.preview_ttl = float(self.cfg.get("depclean", {}).get("preview_ttl", 30))
+        self._last_preview: Optional[Tuple[Tuple, Dict[str,Any], float]] = None
         # modules
         self.db = db_mod if db_mod else None
         self.remover = remover_mod if remover_mod else None
@@ -135,6 +138,7 @@ class Depclean:
         """
         exclude = set([e for e in (exclude or [])])
         keep = set([k for k in (keep or [])])
+        key = self._preview_key(include_protected, exclude, keep)
         installed = set()
         referenced = set()
         protected = set(self.protected)
@@ -143,44 +147,45 @@ class Depclean:
         # get installed via db
         if self.db and hasattr(self.db, "list_installed_quick"):
             try:
-                for r in self.db.list_installed_quick():
-                    installed.add(r["name"])
+                if hasattr(self.db, "installed_names"):
+                    # name column only, straight off the cursor
+                    installed.update(self.db.installed_names())
+                else:
+                    for r in self.db.list_installed_quick():
+                        installed.add(r["name"])
             except Exception as e:
                 _log("depclean", f"db.list_installed_quick failed: {e}", "ERROR")
         else:
             _log("depclean", "db module not present; cannot list installed packages", "ERROR")
             return {"installed": [], "referenced": [], "orphans": [], "protected": list(protected)}
         # get referenced via deps_mod if available (graph)
+        graph_ok = False
         if self.deps and hasattr(self.deps, "build_graph"):
             try:
                 graph = self.deps.build_graph()  # should return dict {pkg: [deps]}
-                for pkg, deps in graph.items():
-                    for d in deps:
-                        referenced.add(d)
+                for deps in graph.values():
+                    referenced.update(deps)
+                graph_ok = True
             except Exception:
-                # fallback: query revdeps per package (slower)
-                for pkg in list(installed):
-                    try:
-                        rev = set(self.db.find_revdeps(pkg))
-                        referenced.update(rev)
-                    except Exception:
-                        pass
-        else:
-            # fallback: derive from DB deps table
-            if self.db:
-                try:
-                    # find all depends_on entries in DB
-                    cur = self.db._execute("SELECT DISTINCT depends_on FROM deps")
-                    for r in cur.fetchall():
-                        referenced.add(r["depends_on"])
-                except Exception:
-                    pass
+                pass
+        if not graph_ok and self.db:
+            # fallback: DB deps table — one reverse-dependency index for every installed package
+            try:
+                if hasattr(self.db, "reverse_deps_index"):
+                    referenced.update(dep for dep, users in self.db.reverse_deps_index().items() if users)
+                else:
+                    # slower: one revdeps query per package; referenced = has at least one dependent
+                    for pkg in list(installed):
+                        if self.db.find_revdeps(pkg):
+                            referenced.add(pkg)
+            except Exception as e:
+                _log("depclean", f"reverse dependency lookup failed: {e}", "ERROR")
         # Compute orphans
         candidates = installed - referenced - protected - exclude
         # Ensure we don't remove items in keep list
         candidates = candidates - keep
         # return sorted lists for deterministic output
-        return {
+        result = {
             "installed": sorted(installed),
             "referenced": sorted(referenced),
             "protected": sorted(protected),
@@ -188,6 +193,26 @@ class Depclean:
             "keep": sorted(keep),
             "orphans": sorted(candidates)
         }
+        self._last_preview = (key, result, time.monotonic())
+        return result
+
+    @staticmethod
+    def _preview_key(include_protected: bool, exclude: Optional[Set[str]], keep: Optional[Set[str]]) -> Tuple:
+        return (bool(include_protected), tuple(sorted(exclude or ())), tuple(sorted(keep or ())))
+
+    def _recent_preview(self, include_protected: bool, exclude: Optional[List[str]], keep: Optional[List[str]]) -> Optional[Dict[str,Any]]:
+        """
+        Retorna o último resultado de find_orphan_candidates se foi calculado com os mesmos
+        argumentos há menos de preview_ttl segundos (fluxo típico: preview -> confirmação -> execute).
+        """
+        if not self._last_preview:
+            return None
+        key, result, ts = self._last_preview
+        if key != self._preview_key(include_protected, set(exclude or ()), set(keep or ())):
+            return None
+        if time.monotonic() - ts > self.preview_ttl:
+            return None
+        return result
 
     # -----------------------------
     # Backup helpers
@@ -357,12 +382,14 @@ class Depclean:
                 parallel: bool = True,
                 max_workers: Optional[int] = None,
                 backup: Optional[bool] = None,
-                report_tag: Optional[str] = None) -> Dict[str,Any]:
+                report_tag: Optional[str] = None,
+                refresh: bool = False) -> Dict[str,Any]:
         """
         Main entry point.
          - apply: if False -> dry-run, True -> perform removals
          - only: if set, only these packages are candidates (must be subset of found orphans)
          - exclude/keep: lists to exclude or keep
+         - refresh: ignore a recent find_orphan_candidates() result and recompute
         Returns a report dict.
         """
         with _lock:
@@ -370,7 +397,7 @@ class Depclean:
                 "ts": _now_iso(),
                 "apply": bool(apply),
                 "dry_run": not bool(apply),
-                "config": {"protected": sorted(list(self.protected))},
+                "config": {"protected": sorted(self.protected)},
                 "candidates": [],
                 "results": [],
             }
@@ -378,7 +405,9 @@ class Depclean:
             backup = self.auto_backup if backup is None else bool(backup)
 
             # find candidates
-            cand_info = self.find_orphan_candidates(include_protected=include_protected, exclude=exclude, keep=keep)
+            cand_info = None if refresh else self._recent_preview(include_protected, exclude, keep)
+            if cand_info is None:
+                cand_info = self.find_orphan_candidates(include_protected=include_protected, exclude=exclude, keep=keep)
             candidates = set(cand_info.get("orphans", []))
             report["candidates_raw"] = cand_info
 
@@ -394,50 +423,79 @@ class Depclean:
                 report["summary"] = {"removed": 0, "skipped": 0}
                 return report
 
-            # prepare removal list (ordered) — minimal heuristic: remove largest packages first
-            # get sizes via db if available
-            pkg_sizes = {}
-            if self.db:
-                try:
-                    for p in candidates:
-                        m = self.db.get_package_manifest(p)
-                        size = (m.get("size") if isinstance(m, dict) else None) if m else None
-                        pkg_sizes[p] = size or 0
-                except Exception:
-                    pass
-            # sort descending by size, fallback alphabetical
-            ordered = sorted(list(candidates), key=lambda x: (-pkg_sizes.get(x, 0), x))
-            report["ordered_candidates"] = ordered
-
-            # removal worker
-            def _worker(pkg_name: str) -> Dict[str,Any]:
-                try:
-                    r = self._remove_package(pkg_name, dry_run=not apply, backup=backup)
-                    # record event in db
+            # per-package results are collected and written as events in one batch at the end
+            events: List[Tuple[str, Dict[str,Any]]] = []
+            if not apply:
+                # dry-run still lists the pre_remove hooks that would run; it only skips the
+                # size lookup, backups and the pool
+                ordered = list(report["candidates"])  # already sorted above
+                report["ordered_candidates"] = ordered
+                results = []
+                for p in ordered:
+                    try:
+                        r = self._remove_package(p, dry_run=True, backup=False)
+                    except Exception as e:
+                        r = {"ok": False, "errors": [str(e), traceback.format_exc()]}
+                    events.append((p, r))
+                    results.append({"pkg": p, "result": r})
+            else:
+                # prepare removal list (ordered) — minimal heuristic: remove largest packages first
+                # get sizes via db if available
+                pkg_sizes = {}
+                if self.db:
                     try:
-                        if self.db and hasattr(self.db, "record_event"):
-                            self.db.record_event("depclean.remove", level="INFO", package=pkg_name, payload=r)
+                        if hasattr(self.db, "get_packages_many"):
+                            # single batched query instead of one manifest load per candidate
+                            rows = self.db.get_packages_many(list(candidates))
+                            for p in candidates:
+                                pkg_sizes[p] = (rows.get(p) or {}).get("size") or 0
+                        else:
+                            for p in candidates:
+                                m = self.db.get_package_manifest(p)
+                                size = (m.get("size") if isinstance(m, dict) else None) if m else None
+                                pkg_sizes[p] = size or 0
                     except Exception:
                         pass
-                    return {"pkg": pkg_name, "result": r}
-                except Exception as e:
-                    return {"pkg": pkg_name, "result": {"ok": False, "errors": [str(e), traceback.format_exc()]}}
-            results = []
-            if parallel and max_workers > 1:
-                with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                    futures = {ex.submit(_worker, p): p for p in ordered}
-                    for fut in as_completed(futures):
-                        p = futures[fut]
-                        try:
-                            res = fut.result()
-                        except Exception as e:
-                            res = {"pkg": p, "result": {"ok": False, "errors": [str(e), traceback.format_exc()]}}
-                        results.append(res)
-            else:
-                for p in ordered:
-                    results.append(_worker(p))
+                # sort descending by size, fallback alphabetical
+                ordered = sorted(candidates, key=lambda x: (-pkg_sizes.get(x, 0), x))
+                report["ordered_candidates"] = ordered
+
+                # removal worker
+                def _worker(pkg_name: str) -> Dict[str,Any]:
+                    try:
+                        r = self._remove_package(pkg_name, dry_run=not apply, backup=backup)
+                        events.append((pkg_name, r))
+                        return {"pkg": pkg_name, "result": r}
+                    except Exception as e:
+                        return {"pkg": pkg_name, "result": {"ok": False, "errors": [str(e), traceback.format_exc()]}}
+                results = []
+                if parallel and max_workers > 1:
+                    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                        futures = {ex.submit(_worker, p): p for p in ordered}
+                        for fut in as_completed(futures):
+                            p = futures[fut]
+                            try:
+                                res = fut.result()
+                            except Exception as e:
+                                res = {"pkg": p, "result": {"ok": False, "errors": [str(e), traceback.format_exc()]}}
+                            results.append(res)
+                else:
+                    for p in ordered:
+                        results.append(_worker(p))
+            # record events in db: one transaction for the whole run
+            try:
+                if self.db and hasattr(self.db, "record_events_many"):
+                    self.db.record_events_many("depclean.remove", events, level="INFO")
+                elif self.db and hasattr(self.db, "record_event"):
+                    for pkg_name, r in events:
+                        self.db.record_event("depclean.remove", level="INFO", package=pkg_name, payload=r)
+            except Exception:
+                pass
 
             report["results"] = results
+            if apply:
+                # installed set changed: a memoized preview is stale now
+                self._last_preview = None
             # summary
             removed = sum(1 for r in results if r["result"].get("ok"))
             failed = sum(1 for r in results if not r["result"].get("ok"))
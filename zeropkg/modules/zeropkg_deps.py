@@ -9,7 +9,9 @@ Features implemented:
  - Cache by combined hash of recipe files (fast invalidation)
  - Support for optional deps and alternatives:
      * In recipe, dependency can be string "pkgname", list ["pkgA","pkgB"] (interpreted as OR),
-       or "pkgA || pkgB" textual alternative
+       or "pkgA || pkgB" textual alternative; one edge per group, to the first installed
+       alternative, else the first with a recipe (choices kept in meta["alt_choices"];
+       the cache is dropped when the installed alternatives change)
  - Integration with zeropkg_vuln to check CVEs for dependencies (best-effort)
  - Export graph as DOT (Graphviz) and JSON
  - Impact analysis: list packages affected by change/removal
@@ -27,16 +29,21 @@ Usage (examples):
 
 from __future__ import annotations
 import os
+import re
 import sys
 import json
 import time
-import glob
 import hashlib
+import mmap
+import pickle
 import logging
 import threading
+from array import array
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any, Iterable, Union
+from typing import Dict, List, Set, Tuple, Optional, Any, Iterable, Union, FrozenSet
 from collections import defaultdict, deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional internal imports from the Zeropkg project
 try:
@@ -83,57 +90,179 @@ except Exception:
     ZeroPKGDB = None
     _get_default_db = None
 
+# zeropkg_vuln drags in update/patcher/depclean and packaging (tens of ms); most deps
+# commands never need it, so it is imported on first use
+_VULN_MOD: Any = None
+
+def _vuln_module():
+    global _VULN_MOD
+    if _VULN_MOD is None:
+        try:
+            import zeropkg_vuln as mod
+        except Exception:
+            mod = False
+        _VULN_MOD = mod
+    return _VULN_MOD or None
+
+def _cmp_versions(a: str, b: str) -> Optional[int]:
+    """Version-aware compare (packed ints / packaging / fallback key) from zeropkg_vuln; None if unavailable."""
+    mod = _vuln_module()
+    return mod._cmp_versions(a, b) if mod else None
+
 try:
-    from zeropkg_vuln import ZeroPKGVulnManager
-    VULN_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except Exception:
-    VULN_AVAILABLE = False
-    ZeroPKGVulnManager = None
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 try:
-    from zeropkg_builder import ZeropkgBuilder
-    BUILDER_AVAILABLE = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
 except Exception:
-    BUILDER_AVAILABLE = False
-    ZeropkgBuilder = None
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except Exception:
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+# CSR graph kernels (numba-compiled when available)
+import _deps_kernels as kernels
+
+# the builder (and through it patcher/vuln/update) only matters to resolve_and_build
+_BUILDER_CLS: Any = None
+
+def _builder_class():
+    global _BUILDER_CLS
+    if _BUILDER_CLS is None:
+        try:
+            from zeropkg_builder import ZeropkgBuilder
+        except Exception:
+            ZeropkgBuilder = False
+        _BUILDER_CLS = ZeropkgBuilder
+    return _BUILDER_CLS or None
 
 # Module-wide config and logger
 CFG = load_config()
 PORTS_DIR = Path(CFG.get("paths", {}).get("ports_dir", "/usr/ports"))
 CACHE_DIR = Path(CFG.get("paths", {}).get("cache_dir", "/var/cache/zeropkg"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
-DEPS_CACHE_FILE = CACHE_DIR / "deps_graph_cache.json"
+DEPS_CACHE_FILE = CACHE_DIR / "deps_graph_cache.bin"
 DEPS_HASH_FILE = CACHE_DIR / "deps_graph_hash.txt"
+DEPS_STAT_FILE = CACHE_DIR / "deps_graph_stat.txt"
+# ports dir -> {dir: [mtime_ns, subdir names, recipe names]}: lets a warm start stat directories
+# instead of listing them (a directory's mtime changes whenever an entry is added/removed/renamed)
+DEPS_TREE_FILE = CACHE_DIR / "deps_tree_index.bin"
+RECIPE_EXTS = (".toml", ".yaml", ".yml")
+VULN_CACHE_FILE = CACHE_DIR / "vuln_cache.bin"
+# a recipe walk/hash younger than this (seconds) is reused instead of redone
+RECIPE_SCAN_TTL = 1.0
 
 logger = get_logger("zeropkg.deps")
 LOCK = threading.RLock()
+# graphs at least this large run traversals on the CSR view instead of name sets
+CSR_MIN_NODES = int(CFG.get("deps", {}).get("csr_min_nodes", 2000))
+# subsets smaller than 1/CSR_SUBSET_DIVISOR of the graph stay on the set path (CSR kernels touch O(V) buffers)
+CSR_SUBSET_DIVISOR = 8
+GRAPH_MEMO_MAX = 1024
 
 # -------------------------
 # Utilities
 # -------------------------
-def _sha1_of_file(path: Path) -> str:
-    h = hashlib.sha1()
+def _hash_file(path: Path) -> str:
+    """Content digest used for cache keying: blake3 over an mmap when available, sha1 otherwise."""
     with open(path, "rb") as f:
+        if BLAKE3_AVAILABLE:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return blake3.blake3(mm).hexdigest()
+            except ValueError:
+                # empty files cannot be mapped
+                return blake3.blake3(b"").hexdigest()
+        h = hashlib.sha1()
         for chunk in iter(lambda: f.read(65536), b""):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
-def _file_list_hash(paths: Iterable[Path]) -> str:
-    h = hashlib.sha1()
-    for p in sorted(str(x) for x in paths):
+def _hash_files(paths: Iterable[Path], max_workers: int = 4) -> Dict[str, str]:
+    """Per-file content digests keyed by path string."""
+    def _one(p: str) -> str:
         try:
-            content_hash = _sha1_of_file(Path(p))
-            h.update(str(p).encode("utf-8"))
-            h.update(content_hash.encode("utf-8"))
+            return _hash_file(Path(p))
         except Exception:
             # if unreadable, include path and mtime
             try:
-                m = Path(p).stat().st_mtime
-                h.update(f"{p}:{m}".encode("utf-8"))
+                return f"mtime:{Path(p).stat().st_mtime}"
             except Exception:
-                h.update(str(p).encode("utf-8"))
+                return ""
+    ordered = sorted(str(x) for x in paths)
+    # many small files: let several stream through the page cache at once
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+        return dict(zip(ordered, ex.map(_one, ordered)))
+
+def _fold_hashes(file_hashes: Dict[str, str]) -> str:
+    """Combine per-file digests into the recipe-set hash."""
+    h = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.sha1()
+    for p in sorted(file_hashes):
+        h.update(p.encode("utf-8") + b"\0" + file_hashes[p].encode("utf-8"))
     return h.hexdigest()
 
+def _file_list_hash(paths: Iterable[Path], max_workers: int = 4) -> str:
+    return _fold_hashes(_hash_files(paths, max_workers))
+
+def _alt_candidates(meta: Dict[str, Dict[str, Any]]) -> Set[str]:
+    """Every package named in an OR group, from the alt_choices kept in node meta."""
+    out: Set[str] = set()
+    for m in meta.values():
+        for _idx, chosen, others in m.get("alt_choices") or ():
+            out.add(chosen)
+            out.update(others)
+    return out
+
+def _stat_list_hash(paths: Iterable[Path]) -> str:
+    """Cheap first-level key: (path, mtime_ns, size, inode) per file, no content reads."""
+    h = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.sha1()
+    for p in sorted(str(x) for x in paths):
+        try:
+            st = os.stat(p)
+            h.update(f"{p}\0{st.st_mtime_ns}:{st.st_size}:{st.st_ino}\n".encode("utf-8"))
+        except OSError:
+            h.update(f"{p}\0-\n".encode("utf-8"))
+    return h.hexdigest()
+
+def _dump_cache(data: Dict[str,Any]) -> bytes:
+    """
+    Serialize an on-disk cache: orjson when available, otherwise pickle
+    protocol 5 (about 2x faster than the stdlib json encoder on the graph).
+    Human-readable output stays with export_json/export_dot.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return pickle.dumps(data, protocol=5)
+
+def _load_cache(raw: bytes) -> Dict[str,Any]:
+    """Inverse of _dump_cache; the format is sniffed, so either writer's file loads."""
+    if raw[:1] == b"\x80":
+        return pickle.loads(raw)
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+_ALT_RE = re.compile(r"\s*\|\|\s*")
+# bare name: first token, cut at a slot (":") or version operator
+_DEP_NAME_RE = re.compile(r"^\s*([^\s:<>=!]*)")
+# characters that end a bare name; a token with none of them is its own name
+_DEP_NAME_STOP = frozenset(" \t\n\r\f\v:<>=!")
+
+@lru_cache(maxsize=4096)
+def _split_alternatives(dep: str) -> Tuple[str, ...]:
+    """"pkgA || pkgB" -> ("pkgA", "pkgB"); memoized since the same strings recur across recipes."""
+    return tuple(_ALT_RE.split(dep.strip())) if "||" in dep else (dep,)
+
 def _normalize_dep_entry(dep: Union[str, List[str], Dict[str,Any]]) -> List[List[str]]:
     """
     Normalize dependency specification to a list of alternatives lists.
@@ -144,152 +273,650 @@ def _normalize_dep_entry(dep: Union[str, List[str], Dict[str,Any]]) -> List[List
       {"name":"pkg","optional":True} -> [["pkg"]]
     Return: list of alternative-groups (each group a list of package names)
     """
+    if isinstance(dep, str):
+        return [list(_split_alternatives(dep))]
     if isinstance(dep, dict):
         name = dep.get("name") or dep.get("pkg") or dep.get("package")
-        if isinstance(name, str) and "||" in name:
-            alts = [x.strip() for x in name.split("||")]
-            return [alts]
+        if isinstance(name, str):
+            return [list(_split_alternatives(name))]
         if isinstance(name, list):
             return [name]
         return [[name]]
     if isinstance(dep, list):
         # treat list as alternatives OR
         return [list(dep)]
-    if isinstance(dep, str):
-        if "||" in dep:
-            parts = [x.strip() for x in dep.split("||")]
-            return [parts]
-        # single package
-        return [[dep]]
     return []
 
+@lru_cache(maxsize=8192)
+def _dep_name(dep: str) -> str:
+    """
+    Bare package name of a dependency token, shared by every place that parses dep strings.
+    e.g. "libfoo>=1.2" -> "libfoo", "gcc:12" -> "gcc", "zlib (optional)" -> "zlib"
+    """
+    if _DEP_NAME_STOP.isdisjoint(dep):
+        # plain "glibc": one C-level scan, no match object
+        return dep
+    return _DEP_NAME_RE.match(dep).group(1)
+
+def _read_recipe_deps(path: Path) -> Optional[Tuple[str, Optional[str], List[Any]]]:
+    """
+    Load one recipe and return (name, version, raw dependency entries), or None if unreadable.
+    Accepts both the raw TOML layout ([package] table) and the flattened load_recipe() layout.
+    """
+    try:
+        recipe = load_recipe(str(path))
+        pkg = recipe.get("package") or {}
+        name = pkg.get("name") or recipe.get("name") or Path(path).stem
+        version = pkg.get("version") or recipe.get("version")
+        deps_raw = recipe.get("dependencies") or recipe.get("depends") or []
+        # allow dictionary keyed dependencies in some recipes
+        if isinstance(deps_raw, dict):
+            deps_raw = [{"name": k, "req": v} for k, v in deps_raw.items()]
+        return name, version, list(deps_raw)
+    except Exception as e:
+        logger.debug("Failed to parse recipe %s: %s", path, e)
+        return None
+
+def _parse_one(path: str) -> Optional[Tuple[str, Dict[str,Any], List[List[str]]]]:
+    """
+    Parse one recipe into (name, meta, dependency groups); each group lists the bare names of
+    one dependency's alternatives. Top-level and side-effect free so it can run in a worker process.
+    """
+    item = _read_recipe_deps(Path(path))
+    if item is None:
+        return None
+    name, version, deps_raw = item
+    groups = []
+    for d in deps_raw:
+        for group in _normalize_dep_entry(d):
+            names = []
+            for candidate in group:
+                if candidate:
+                    cand = _dep_name(str(candidate))
+                    if cand:
+                        names.append(cand)
+            if names:
+                # "a || a" and repeated alternatives collapse, keeping first-seen order
+                groups.append(list(dict.fromkeys(names)))
+    return name, {"recipe": path, "version": version}, groups
+
+# path -> (mtime_ns, parsed) so repeated scans skip recipes that did not change
+_RECIPE_PARSE_CACHE: Dict[str, Tuple[int, Tuple[str, Dict[str,Any], List[List[str]]]]] = {}
+# below this many files a process pool costs more to start than it saves
+PROCESS_POOL_MIN_FILES = 64
+
+def _parse_recipes(paths: List[str], max_workers: int) -> List[Optional[Tuple[str, Dict[str,Any], List[List[str]]]]]:
+    """Parse recipes, reusing unchanged ones; misses go to a process pool (threads as fallback)."""
+    results: List[Optional[Tuple[str, Dict[str,Any], List[List[str]]]]] = [None] * len(paths)
+    todo = []
+    for i, p in enumerate(paths):
+        try:
+            mtime = os.stat(p).st_mtime_ns
+        except OSError:
+            continue
+        hit = _RECIPE_PARSE_CACHE.get(p)
+        if hit and hit[0] == mtime:
+            results[i] = hit[1]
+        else:
+            todo.append((i, p, mtime))
+    if not todo:
+        return results
+    todo_paths = [p for _, p, _ in todo]
+    workers = max(1, max_workers)
+    out = None
+    if len(todo_paths) >= PROCESS_POOL_MIN_FILES and workers > 1:
+        try:
+            # imported here: concurrent.futures.process pulls in multiprocessing, which
+            # short CLI commands that never parse a large ports tree should not pay for
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                out = list(ex.map(_parse_one, todo_paths, chunksize=64))
+        except Exception as e:
+            logger.debug(f"Process pool unavailable, parsing with threads: {e}")
+    if out is None:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            out = list(ex.map(_parse_one, todo_paths))
+    for (i, p, mtime), r in zip(todo, out):
+        results[i] = r
+        if r is not None:
+            _RECIPE_PARSE_CACHE[p] = (mtime, r)
+    return results
+
+def _tarjan_sets(nodes: Iterable[str], adj: Dict[str, Set[str]], allowed: Optional[Set[str]] = None) -> List[List[str]]:
+    """
+    Strongly connected components via iterative Tarjan over name sets (no recursion, O(V+E)).
+    If allowed is given, edges leaving it are ignored (SCCs of the induced subgraph).
+    """
+    index = 0
+    dfn: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    scc_stack: List[str] = []
+    sccs: List[List[str]] = []
+    for root in nodes:
+        if root in dfn:
+            continue
+        dfn[root] = low[root] = index
+        index += 1
+        scc_stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adj.get(root, ())))]
+        while work:
+            u, it = work[-1]
+            pushed = False
+            for v in it:
+                if allowed is not None and v not in allowed:
+                    continue
+                if v not in dfn:
+                    dfn[v] = low[v] = index
+                    index += 1
+                    scc_stack.append(v)
+                    on_stack.add(v)
+                    work.append((v, iter(adj.get(v, ()))))
+                    pushed = True
+                    break
+                if v in on_stack and dfn[v] < low[u]:
+                    low[u] = dfn[v]
+            if pushed:
+                continue
+            # u fully explored: backtrack
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[u] < low[parent]:
+                    low[parent] = low[u]
+            if low[u] == dfn[u]:
+                comp = []
+                while True:
+                    w = scc_stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == u:
+                        break
+                sccs.append(comp)
+    return sccs
+
+def _johnson_cycles(comp: List[str], adj: Dict[str, Set[str]], limit: Optional[int] = None) -> List[List[str]]:
+    """
+    Enumerate the elementary cycles inside one strongly connected component (Johnson),
+    with explicit stacks instead of recursion. Self-loops are not reported here.
+    """
+    cycles: List[List[str]] = []
+    pending = [set(comp)]
+    while pending:
+        scc = pending.pop()
+        start = next(iter(scc))
+        path = [start]
+        blocked = {start}
+        closed: Set[str] = set()
+        B: Dict[str, Set[str]] = defaultdict(set)
+        stack = [(start, [v for v in adj.get(start, ()) if v in scc and v != start])]
+        while stack:
+            node, nbrs = stack[-1]
+            if nbrs:
+                nxt = nbrs.pop()
+                if nxt == start:
+                    cycles.append(list(path))
+                    if limit is not None and len(cycles) >= limit:
+                        return cycles
+                    closed.update(path)
+                elif nxt not in blocked:
+                    path.append(nxt)
+                    stack.append((nxt, [v for v in adj.get(nxt, ()) if v in scc and v != nxt]))
+                    closed.discard(nxt)
+                    blocked.add(nxt)
+                    continue
+            if not nbrs:
+                if node in closed:
+                    # unblock node and everything waiting on it
+                    todo = [node]
+                    while todo:
+                        w = todo.pop()
+                        if w in blocked:
+                            blocked.discard(w)
+                            todo.extend(B[w])
+                            B[w].clear()
+                else:
+                    for v in adj.get(node, ()):
+                        if v in scc and v != node:
+                            B[v].add(node)
+                stack.pop()
+                path.pop()
+        # every cycle through start is found: drop it and continue on what stays strongly connected
+        scc.discard(start)
+        pending.extend(set(c) for c in _tarjan_sets(scc, adj, scc) if len(c) > 1)
+    return cycles
+
 # -------------------------
 # Graph data structure
 # -------------------------
 class DependencyGraph:
+    # fixed attribute set: no per-instance __dict__, faster attribute access in traversals
+    __slots__ = ("adj", "rev", "_rev_ready", "meta", "nodes", "_scc_id", "_scc_members", "_condensation",
+                 "_version", "_csr", "_csr_version", "_json", "_json_version")
+
     def __init__(self):
-        # adjacency: node -> set of dependee names (edges node -> dependee)
+        # adjacency: node -> set of dependee names (edges node -> dependee); sorted tuples once frozen
         self.adj: Dict[str, Set[str]] = defaultdict(set)
-        # reverse adjacency: dependee -> set(nodes that depend on it)
+        # reverse adjacency: dependee -> set(nodes that depend on it); sorted tuples once frozen.
+        # Built lazily by _ensure_rev on first read, then kept in step with add_edge.
         self.rev: Dict[str, Set[str]] = defaultdict(set)
+        self._rev_ready = False
         # metadata per node
         self.meta: Dict[str, Dict[str,Any]] = {}
         # all nodes
         self.nodes: Set[str] = set()
+        # SCC condensation (built on demand, dropped on any mutation)
+        self._scc_id: Optional[Dict[str, int]] = None
+        self._scc_members: List[List[str]] = []
+        self._condensation: Dict[int, Set[int]] = {}
+        # bumped on every mutation; derived views (CSR) are rebuilt when it moves
+        self._version = 0
+        self._csr: Optional[Dict[str, Any]] = None
+        self._csr_version = -1
+        # last to_json() result, reused while the graph is unchanged
+        self._json: Optional[Dict[str, Any]] = None
+        self._json_version = -1
+
+    def _invalidate(self):
+        self._version += 1
+        self._scc_id = None
+
+    @staticmethod
+    def _edge_set(table: Dict[str, Any], name: str) -> Set[str]:
+        """Mutable edge set of name, turning a frozen tuple back into a set on demand."""
+        targets = table.get(name)
+        if targets is None:
+            targets = table[name] = set()
+        elif type(targets) is tuple:
+            targets = table[name] = set(targets)
+        return targets
+
+    def _ensure_rev(self) -> Dict[str, Any]:
+        """Reverse index, built in one pass over adj the first time it is needed."""
+        if not self._rev_ready:
+            rev: Dict[str, List[str]] = {n: [] for n in self.nodes}
+            # sources visited in sorted order, so every list comes out sorted
+            for src in sorted(self.adj):
+                for d in self.adj[src]:
+                    rev[d].append(src)
+            self.rev = defaultdict(set, {n: tuple(srcs) for n, srcs in rev.items()})
+            self._rev_ready = True
+        return self.rev
+
+    def freeze(self) -> None:
+        """
+        Store every edge list as a sorted tuple once the build is done: a small tuple
+        takes a fraction of an empty set's memory and traversals only iterate. Edits
+        afterwards thaw just the entries they touch (see _edge_set).
+        """
+        for table in ((self.adj, self.rev) if self._rev_ready else (self.adj,)):
+            for n, targets in table.items():
+                if type(targets) is not tuple:
+                    table[n] = tuple(sorted(targets))
 
     def add_node(self, name: str, meta: Optional[Dict[str,Any]] = None):
+        # interned names: set/dict lookups hit the identity fast path and duplicates share memory
+        name = sys.intern(name)
         if name not in self.nodes:
+            self._invalidate()
             self.nodes.add(name)
-            self.adj.setdefault(name, set())
-            self.rev.setdefault(name, set())
+            self.adj.setdefault(name, ())
+            if self._rev_ready:
+                self.rev.setdefault(name, ())
         if meta:
             self.meta.setdefault(name, {}).update(meta)
 
     def add_edge(self, pkg: str, dependee: str):
+        pkg = sys.intern(pkg)
+        dependee = sys.intern(dependee)
         self.add_node(pkg)
         self.add_node(dependee)
         if dependee not in self.adj[pkg]:
-            self.adj[pkg].add(dependee)
-            self.rev[dependee].add(pkg)
+            self._invalidate()
+            self._edge_set(self.adj, pkg).add(dependee)
+            if self._rev_ready:
+                self._edge_set(self.rev, dependee).add(pkg)
 
     def remove_node(self, name: str):
         if name not in self.nodes:
             return
+        self._invalidate()
+        self._ensure_rev()
         # remove edges
-        for d in list(self.adj.get(name, [])):
-            self.rev.get(d, set()).discard(name)
-        for p in list(self.rev.get(name, [])):
-            self.adj.get(p, set()).discard(name)
+        for d in list(self.adj.get(name, ())):
+            if d in self.rev:
+                self._edge_set(self.rev, d).discard(name)
+        for p in list(self.rev.get(name, ())):
+            if p in self.adj:
+                self._edge_set(self.adj, p).discard(name)
         self.adj.pop(name, None)
         self.rev.pop(name, None)
         self.nodes.discard(name)
         self.meta.pop(name, None)
 
+    def clear_out_edges(self, name: str):
+        """Drop every dependency edge of name, keeping the node and its dependents."""
+        targets = self.adj.get(name)
+        if not targets:
+            return
+        self._invalidate()
+        if self._rev_ready:
+            for d in targets:
+                if d in self.rev:
+                    self._edge_set(self.rev, d).discard(name)
+        self.adj[name] = ()
+
     def out_edges(self, name: str) -> Set[str]:
         return set(self.adj.get(name, set()))
 
     def in_edges(self, name: str) -> Set[str]:
-        return set(self.rev.get(name, set()))
+        return set(self._ensure_rev().get(name, ()))
+
+    # read-only views for internal traversals: no per-call copy, callers must not mutate
+    def iter_out(self, name: str) -> Iterable[str]:
+        return self.adj.get(name, ())
 
-    def topo_sort(self, subset: Optional[Set[str]] = None) -> Tuple[bool, List[str], Optional[List[List[str]]]]:
+    def iter_in(self, name: str) -> Iterable[str]:
+        return self._ensure_rev().get(name, ())
+
+    def to_csr(self) -> Dict[str, Any]:
+        """
+        Dense integer view of the graph in compressed-sparse-row form, rebuilt lazily when the graph changes.
+        Keys: names, name_to_id, indptr/indices (dependencies), rev_indptr/rev_indices (dependents).
+        """
+        if self._csr is not None and self._csr_version == self._version:
+            return self._csr
+        names = sorted(self.nodes)
+        name_to_id = {n: i for i, n in enumerate(names)}
+
+        def _pack(table):
+            indptr = array("l", [0])
+            indices = array("l")
+            for n in names:
+                indices.extend(name_to_id[d] for d in table.get(n, ()) if d in name_to_id)
+                indptr.append(len(indices))
+            if NUMPY_AVAILABLE:
+                return np.asarray(indptr, dtype=np.int32), np.asarray(indices, dtype=np.int32)
+            return indptr, indices
+
+        indptr, indices = _pack(self.adj)
+        rev_indptr, rev_indices = _pack(self._ensure_rev())
+        self._csr = {"names": names, "name_to_id": name_to_id, "indptr": indptr, "indices": indices,
+                     "rev_indptr": rev_indptr, "rev_indices": rev_indices}
+        self._csr_version = self._version
+        return self._csr
+
+    def _use_csr(self, work: Optional[int] = None, numpy_ok: bool = False) -> bool:
+        """
+        Run a traversal on the CSR view only where it pays: compiled kernels (or, with numpy_ok,
+        the numpy frontier sort), a large graph, and a subset (work) covering a sizeable share of it.
+        Without numba the kernels are plain Python over lists and lose to the set code.
         """
-        Topological sort of the graph or given subset.
+        if not (kernels.NUMBA_AVAILABLE or (numpy_ok and kernels.NUMPY_AVAILABLE)):
+            return False
+        n = len(self.nodes)
+        return n >= CSR_MIN_NODES and (work is None or work * CSR_SUBSET_DIVISOR >= n)
+
+    def reverse_closure(self, name: str) -> Set[str]:
+        """All packages that depend on name, directly or transitively."""
+        if self._use_csr():
+            csr = self.to_csr()
+            start = csr["name_to_id"].get(name)
+            if start is None:
+                return set()
+            names = csr["names"]
+            n = len(names)
+            out = kernels.new_buffer(n)
+            count = kernels.reach_csr(csr["rev_indptr"], csr["rev_indices"], start, kernels.new_buffer(n), out)
+            return {names[i] for i in kernels.to_list(out, count)}
+        rev = self._ensure_rev()
+        impacted = set()
+        q = deque([name])
+        pop, push, mark = q.popleft, q.append, impacted.add
+        while q:
+            for dep in rev.get(pop(), ()):
+                if dep not in impacted:
+                    mark(dep)
+                    push(dep)
+        return impacted
+
+    def topo_sort(self, subset: Optional[Set[str]] = None, indeg: Optional[Dict[str, int]] = None) -> Tuple[bool, List[str], Optional[List[List[str]]]]:
+        """
+        Topological sort of the graph or given subset (Kahn), dependencies first.
         Returns (ok, order_list, levels) where levels is a list of lists (parallel build groups).
         If a cycle is found, ok=False and order_list contains nodes in partial order.
+        indeg may carry precomputed pending-dependency counts for subset (it is consumed).
         """
-        if subset is None:
-            subset = set(self.nodes)
-        indeg = {}
-        for n in subset:
-            indeg[n] = 0
-        for n in subset:
-            for m in self.adj.get(n, []):
-                if m in subset:
-                    indeg[m] = indeg.get(m, 0) + 1
-        q = deque([n for n, d in indeg.items() if d == 0])
+        if indeg is None and self._use_csr(None if subset is None else len(subset), numpy_ok=True):
+            return self._topo_sort_csr(subset)
+        adj = self.adj
+        rev = self._ensure_rev()
+        if indeg is not None:
+            pass
+        elif subset is None or subset == self.nodes:
+            # whole graph: no intersection needed (a same-sized subset may still name other nodes)
+            indeg = {n: len(adj.get(n, ())) for n in self.nodes}
+        else:
+            subset = frozenset(subset)
+            indeg = {n: sum(1 for d in adj.get(n, ()) if d in subset) for n in subset}
+        total = len(indeg)
+        level = [n for n, d in indeg.items() if d == 0]
         order = []
         levels = []
-        while q:
-            level_size = len(q)
-            level = []
-            for _ in range(level_size):
-                n = q.popleft()
-                order.append(n)
-                level.append(n)
-                for m in self.adj.get(n, []):
-                    if m in indeg:
+        while level:
+            # each level is sorted by name: the plan no longer depends on set/hash iteration order
+            level.sort()
+            nxt = []
+            for n in level:
+                # walk dependents: n is built, so each of them has one fewer pending dependency
+                for m in rev.get(n, ()):
+                    try:
                         indeg[m] -= 1
-                        if indeg[m] == 0:
-                            q.append(m)
+                    except KeyError:
+                        continue
+                    if indeg[m] == 0:
+                        nxt.append(m)
+            order.extend(level)
             levels.append(level)
-        if len(order) != len(subset):
+            level = nxt
+        if len(order) != total:
             # cycle detected
             return False, order, levels
         return True, order, levels
 
-    def find_cycles(self) -> List[List[str]]:
-        """
-        Detect simple cycles using DFS (Tarjan would be more complete; this is reasonable).
-        Returns list of cycles (each cycle list of nodes).
-        """
-        visited = set()
-        stack = []
-        onstack = set()
-        cycles = []
-        def dfs(u):
-            visited.add(u)
-            stack.append(u)
-            onstack.add(u)
-            for v in self.adj.get(u, []):
-                if v not in visited:
-                    dfs(v)
-                elif v in onstack:
-                    # found cycle: nodes from v..end of stack
-                    try:
-                        idx = stack.index(v)
-                        cycles.append(stack[idx:].copy())
-                    except ValueError:
-                        pass
-            stack.pop()
-            onstack.discard(u)
-        for node in list(self.nodes):
-            if node not in visited:
-                dfs(node)
-        return cycles
+    def _topo_sort_csr(self, subset: Optional[Set[str]] = None) -> Tuple[bool, List[str], Optional[List[List[str]]]]:
+        csr = self.to_csr()
+        names = csr["names"]
+        n = len(names)
+        if subset is None:
+            members = range(n)
+        else:
+            name_to_id = csr["name_to_id"]
+            members = [name_to_id[x] for x in subset if x in name_to_id]
+        if NUMPY_AVAILABLE and not kernels.NUMBA_AVAILABLE:
+            # no compiler: vectorize per frontier instead
+            id_levels = kernels.kahn_csr_frontier(csr["indptr"], csr["indices"], csr["rev_indptr"], csr["rev_indices"], list(members))
+        else:
+            in_sub = kernels.new_buffer(n, 1 if subset is None else 0)
+            if subset is not None:
+                for i in members:
+                    in_sub[i] = 1
+            order_buf = kernels.new_buffer(n)
+            level_end = kernels.new_buffer(n + 1)
+            total, n_levels = kernels.kahn_csr(csr["indptr"], csr["indices"], csr["rev_indptr"], csr["rev_indices"], n,
+                                               in_sub, kernels.new_buffer(n), order_buf, level_end)
+            ids = kernels.to_list(order_buf, total)
+            id_levels = []
+            start = 0
+            for end in kernels.to_list(level_end, n_levels):
+                id_levels.append(ids[start:end])
+                start = end
+        # ids follow sorted names, so sorting ids orders each level by name like the set path
+        levels = [[names[i] for i in sorted(lvl)] for lvl in id_levels]
+        order = [x for lvl in levels for x in lvl]
+        return len(order) == len(members), order, levels
 
-    def to_dot(self) -> str:
-        lines = ["digraph deps {"]
+    def find_sccs(self) -> List[List[str]]:
+        """
+        Strongly connected components via iterative Tarjan (no recursion, O(V+E)).
+        Returns every component, including single nodes.
+        """
+        if self._use_csr():
+            csr = self.to_csr()
+            names = csr["names"]
+            n = len(names)
+            buf = kernels.new_buffer
+            scc_id = buf(n)
+            n_scc = kernels.tarjan_csr(csr["indptr"], csr["indices"], n, buf(n, -1), buf(n), buf(n), scc_id,
+                                       buf(n), buf(n), buf(n))
+            comps: List[List[str]] = [[] for _ in range(n_scc)]
+            for i, cid in enumerate(kernels.to_list(scc_id, n)):
+                comps[cid].append(names[i])
+            return comps
+        return _tarjan_sets(self.nodes, self.adj)
+
+    def find_cycles(self, enumerate_all: bool = False, limit: Optional[int] = None) -> List[List[str]]:
+        """
+        Detect cycles. By default returns the strongly connected components with more than one
+        node (or a self-loop) as cycle proxies, which is all resolve() needs.
+        With enumerate_all=True lists every elementary cycle (Johnson, per SCC); that output can be
+        exponential, so limit caps how many are returned.
+        """
+        adj = self.adj
+        cyclic = [c for c in self.find_sccs() if len(c) > 1 or c[0] in adj.get(c[0], ())]
+        if not enumerate_all:
+            return cyclic
+        out: List[List[str]] = []
+        for comp in cyclic:
+            for n in comp:
+                if n in adj.get(n, ()):
+                    out.append([n])
+            if len(comp) > 1:
+                remaining = None if limit is None else limit - len(out)
+                if remaining is not None and remaining <= 0:
+                    break
+                out.extend(_johnson_cycles(comp, self.adj, remaining))
+            if limit is not None and len(out) >= limit:
+                return out[:limit]
+        return out
+
+    def build_condensation(self) -> None:
+        """Collapse each SCC into a super-node; the result is a DAG reused by resolve/topo/cycle queries."""
+        sccs = self.find_sccs()
+        scc_id: Dict[str, int] = {}
+        for cid, comp in enumerate(sccs):
+            for n in comp:
+                scc_id[n] = cid
+        cond: Dict[int, Set[int]] = {cid: set() for cid in range(len(sccs))}
+        for u, targets in self.adj.items():
+            cu = scc_id.get(u)
+            if cu is None:
+                continue
+            for v in targets:
+                cv = scc_id.get(v)
+                if cv is not None and cv != cu:
+                    cond[cu].add(cv)
+        self._scc_members = sccs
+        self._condensation = cond
+        self._scc_id = scc_id
+
+    def ensure_condensation(self) -> None:
+        if self._scc_id is None:
+            self.build_condensation()
+
+    def same_scc(self, a: str, b: str) -> bool:
+        self.ensure_condensation()
+        ca = self._scc_id.get(a)
+        return ca is not None and ca == self._scc_id.get(b)
+
+    def cycles_in(self, subset: Iterable[str]) -> List[List[str]]:
+        """Cyclic SCCs (size > 1 or self-loop) that intersect subset, answered from the condensation."""
+        self.ensure_condensation()
+        seen: Set[int] = set()
+        out = []
+        adj, scc_id, members = self.adj, self._scc_id, self._scc_members
+        for n in subset:
+            cid = scc_id.get(n)
+            if cid is None or cid in seen:
+                continue
+            seen.add(cid)
+            comp = members[cid]
+            if len(comp) > 1 or n in adj.get(n, ()):
+                out.append(sorted(comp))
+        out.sort()
+        return out
+
+    def topo_sort_condensed(self, subset: Optional[Set[str]] = None) -> Tuple[bool, List[str], Optional[List[List[str]]]]:
+        """
+        Kahn's sort over the SCC condensation; each SCC is emitted as one contiguous group.
+        Always yields a full order, even when subset contains cycles.
+        """
+        self.ensure_condensation()
+        if subset is None:
+            subset = set(self.nodes)
+        ids = {self._scc_id[n] for n in subset if n in self._scc_id}
+        indeg = dict.fromkeys(ids, 0)
+        dependents: Dict[int, List[int]] = defaultdict(list)
+        for c in ids:
+            for d in self._condensation.get(c, ()):
+                if d in indeg:
+                    indeg[c] += 1
+                    dependents[d].append(c)
+        ready = [c for c, d in indeg.items() if d == 0]
+        order = []
+        levels = []
+        while ready:
+            # components ordered by their sorted member lists, members sorted within each one
+            groups = sorted((sorted(m for m in self._scc_members[c] if m in subset), c) for c in ready)
+            level = []
+            ready = []
+            for members, c in groups:
+                level.extend(members)
+                for d in dependents.get(c, ()):
+                    indeg[d] -= 1
+                    if indeg[d] == 0:
+                        ready.append(d)
+            order.extend(level)
+            levels.append(level)
+        return len(order) == len(subset), order, levels
+
+    def iter_dot_lines(self) -> Iterable[str]:
+        """DOT output one line at a time, so large graphs can be streamed to disk."""
+        yield "digraph deps {"
         for n in sorted(self.nodes):
             label = n
-            lines.append(f'  "{n}" [label="{label}"];')
+            yield f'  "{n}" [label="{label}"];'
         for a, targets in self.adj.items():
             for b in targets:
-                lines.append(f'  "{a}" -> "{b}";')
-        lines.append("}")
-        return "\n".join(lines)
+                yield f'  "{a}" -> "{b}";'
+        yield "}"
+
+    def write_dot(self, f) -> None:
+        """
+        Same document as iter_dot_lines, written straight to a text file: node lines
+        go through one writelines, edges as one write per source node.
+        """
+        f.write("digraph deps {\n")
+        f.writelines(f'  "{n}" [label="{n}"];\n' for n in sorted(self.nodes))
+        for a, targets in self.adj.items():
+            if targets:
+                f.write("".join([f'  "{a}" -> "{b}";\n' for b in targets]))
+        f.write("}")
+
+    def to_dot(self) -> str:
+        return "\n".join(self.iter_dot_lines())
 
     def to_json(self) -> Dict[str,Any]:
-        return {"nodes": list(sorted(self.nodes)), "edges": {n: sorted(list(self.adj.get(n, []))) for n in sorted(self.nodes)}, "meta": self.meta}
+        """Serializable view (shared while the graph is unchanged: callers must not mutate it)."""
+        if self._json is None or self._json_version != self._version:
+            nodes = sorted(self.nodes)
+            self._json = {"nodes": nodes, "edges": {n: sorted(self.adj.get(n, ())) for n in nodes}, "meta": self.meta}
+            self._json_version = self._version
+        else:
+            # meta is swapped wholesale on cache restore; keep the view pointing at the live dict
+            self._json["meta"] = self.meta
+        return self._json
 
 # -------------------------
 # DepsManager
@@ -299,31 +926,119 @@ class DepsManager:
         self.ports_dir = Path(ports_dir or PORTS_DIR)
         self.cache_file = Path(cache_file or DEPS_CACHE_FILE)
         self.hash_file = Path(DEPS_HASH_FILE)
+        self.stat_file = Path(DEPS_STAT_FILE)
+        self.tree_file = Path(DEPS_TREE_FILE)
         self.graph = DependencyGraph()
         self._recipes_index: Dict[str, Path] = {}  # pkg_name -> recipe_path
         self._cache_meta: Dict[str, Any] = {}
-        self._vuln = ZeroPKGVulnManager() if VULN_AVAILABLE else None
+        # per recipe file: content digest and the package it defines (incremental rescans)
+        self._file_hashes: Dict[str, str] = {}
+        self._owners: Dict[str, str] = {}
+        self._installed_cache: Optional[Set[str]] = None
+        # results of impact_analysis / missing_dependencies for the current graph version
+        self._memo: Dict[Tuple[str, Any], Any] = {}
+        self._memo_graph: Optional[DependencyGraph] = None
+        self._vuln_cache: Optional[Dict[str, Any]] = None
+        self._memo_version = -1
+        self._vuln: Any = None  # ZeroPKGVulnManager, created by _vuln_manager() on first use
         self._db = _get_default_db() if DB_AVAILABLE and _get_default_db else None
         self.max_workers = int(CFG.get("deps", {}).get("max_workers", CFG.get("deps", {}).get("max_workers", 4)))
         self.logger = logger
 
+        # (monotonic ts, ports_dir, recipe files, per-file hashes or None): lets scan_recipes right
+        # after the constructor reuse its tree walk and hashing instead of repeating them
+        self._last_recipe_scan: Optional[Tuple[float, str, List[Path], Optional[Dict[str, str]]]] = None
+
         # load cache if valid
         self._load_cache_if_valid()
 
     # -------------------------
     # Scanning and caching
     # -------------------------
+    def _recent_recipe_scan(self) -> Optional[Tuple[float, str, List[Path], Optional[Dict[str, str]]]]:
+        last = self._last_recipe_scan
+        if last and last[1] == str(self.ports_dir) and time.monotonic() - last[0] < RECIPE_SCAN_TTL:
+            return last
+        return None
+
+    def _recipe_file_hashes(self, recipe_files: List[Path]) -> Dict[str, str]:
+        """Per-file content hashes, reused from a walk of the same files less than RECIPE_SCAN_TTL ago."""
+        last = self._recent_recipe_scan()
+        if last and last[3] is not None and last[2] == recipe_files:
+            return last[3]
+        hashes = _hash_files(recipe_files, self.max_workers)
+        if last and last[2] == recipe_files:
+            self._last_recipe_scan = (last[0], last[1], last[2], hashes)
+        return hashes
+
     def _find_recipe_files(self) -> List[Path]:
         """Finds recipe files under ports_dir (toml or yaml)."""
-        # typical layout: /usr/ports/*/*/*.toml or *.yaml
+        last = self._recent_recipe_scan()
+        if last:
+            return list(last[2])
+        files = [Path(p) for p in sorted(self._walk_recipe_tree(str(self.ports_dir)))]
+        self._last_recipe_scan = (time.monotonic(), str(self.ports_dir), files, None)
+        return list(files)
+
+    def _walk_recipe_tree(self, root: str) -> List[str]:
+        """
+        Recipe paths under root. typical layout: /usr/ports/*/*/*.toml or *.yaml.
+        A directory whose mtime matches the persisted tree index reuses its stored listing
+        (one stat); any other directory gets one scandir (dirent types avoid extra stat calls).
+        """
+        prev: Dict[str, Any] = {}
+        try:
+            if self.tree_file.exists():
+                data = _load_cache(self.tree_file.read_bytes())
+                if data.get("root") == root:
+                    prev = data.get("dirs") or {}
+        except Exception as e:
+            self.logger.debug("Ignoring unreadable deps tree index: %s", e)
+        dirs: Dict[str, Any] = {}
         res = []
-        for ext in ("*.toml", "*.yaml", "*.yml"):
-            res.extend(self.ports_dir.rglob(ext))
-        return sorted(res)
+        changed = len(prev) == 0
+        sep = os.sep
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+            hit = prev.get(d)
+            if hit is not None and hit[0] == mtime:
+                entry_rec = hit
+            else:
+                changed = True
+                subdirs, recipes = [], []
+                try:
+                    with os.scandir(d) as it:
+                        for entry in it:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                            elif entry.name.endswith(RECIPE_EXTS) and entry.is_file():
+                                recipes.append(entry.name)
+                except OSError:
+                    continue
+                entry_rec = [mtime, subdirs, recipes]
+            dirs[d] = entry_rec
+            prefix = d if d.endswith(sep) else d + sep
+            if entry_rec[1]:
+                stack.extend([prefix + n for n in entry_rec[1]])
+            if entry_rec[2]:
+                res.extend([prefix + n for n in entry_rec[2]])
+        if changed or len(dirs) != len(prev):
+            try:
+                tmp = self.tree_file.with_suffix(".tmp")
+                tmp.write_bytes(_dump_cache({"root": root, "dirs": dirs}))
+                tmp.replace(self.tree_file)
+            except Exception as e:
+                self.logger.debug("Failed to save deps tree index: %s", e)
+        return res
 
     def _compute_sources_hash(self, file_list: Iterable[Path]) -> str:
         try:
-            return _file_list_hash(file_list)
+            return _fold_hashes(self._recipe_file_hashes(list(file_list)))
         except Exception:
             # fallback simple
             h = hashlib.sha1()
@@ -336,56 +1051,273 @@ class DepsManager:
             return h.hexdigest()
 
     def _load_cache_if_valid(self):
-        """Load cache only if hash matches current recipe set hash."""
+        """
+        Load cache only if the recipe set is unchanged. The stat key (mtime/size/inode) is checked
+        first; file contents are hashed only when it differs from the stored sidecar.
+        """
         try:
+            if not self.cache_file.exists():
+                self.logger.debug("No valid deps cache found")
+                return
             recipe_files = self._find_recipe_files()
-            current_hash = self._compute_sources_hash(recipe_files)
-            if self.hash_file.exists():
-                stored = self.hash_file.read_text().strip()
-                if stored == current_hash and self.cache_file.exists():
-                    try:
-                        data = json.loads(self.cache_file.read_text(encoding="utf-8"))
-                        self._restore_from_cache(data)
-                        self.logger.debug("Deps cache loaded (valid)")
+            stat_hash = _stat_list_hash(recipe_files)
+            valid = self.stat_file.exists() and self.stat_file.read_text().strip() == stat_hash
+            if not valid and self.hash_file.exists():
+                # files were touched: fall back to comparing contents
+                current_hash = self._compute_sources_hash(recipe_files)
+                valid = self.hash_file.read_text().strip() == current_hash
+                if valid:
+                    self.stat_file.write_text(stat_hash, encoding="utf-8")
+            if valid:
+                try:
+                    data = _load_cache(self.cache_file.read_bytes())
+                    if not self._alt_choices_current(data):
+                        self.logger.debug("Installed OR alternatives changed; deps cache is stale")
                         return
-                    except Exception as e:
-                        self.logger.debug(f"Failed to load deps cache: {e}")
+                    self._restore_from_cache(data)
+                    self.logger.debug("Deps cache loaded (valid)")
+                    return
+                except Exception as e:
+                    self.logger.debug(f"Failed to load deps cache: {e}")
             # else no valid cache
             self.logger.debug("No valid deps cache found")
         except Exception as e:
             self.logger.debug(f"Error in _load_cache_if_valid: {e}")
 
     def _restore_from_cache(self, data: Dict[str,Any]):
-        """Restore graph and recipes index from cached JSON structure."""
-        nodes = data.get("nodes", [])
-        edges = data.get("edges", {})
-        meta = data.get("meta", {})
+        """Restore graph and recipes index from the cached structure."""
+        nodes = [sys.intern(n) for n in data.get("nodes", [])]
+        meta = {sys.intern(k): v for k, v in data.get("meta", {}).items()}
         self.graph = DependencyGraph()
+        add_node, add_edge = self.graph.add_node, self.graph.add_edge
         for n in nodes:
-            self.graph.add_node(n, meta.get(n))
-        for a, targets in edges.items():
-            for b in targets:
-                self.graph.add_edge(a, b)
+            add_node(n, meta.get(n))
+        if "edge_pairs" in data:
+            # compact layout: (src_idx, dst_idx) over the node list
+            for i, j in data["edge_pairs"]:
+                add_edge(nodes[i], nodes[j])
+        else:
+            for a, targets in data.get("edges", {}).items():
+                for b in targets:
+                    add_edge(a, b)
         self.graph.meta = meta
-        self._recipes_index = data.get("recipes_index", {})
+        self.graph.freeze()
+        scc = data.get("scc")
+        cond = data.get("condensation")
+        if isinstance(scc, list) and len(scc) == len(nodes) and isinstance(cond, dict):
+            scc_id = dict(zip(nodes, scc))
+            members: List[List[str]] = [[] for _ in range(len(cond))]
+            for n, cid in scc_id.items():
+                members[cid].append(n)
+            self.graph._scc_members = members
+            self.graph._condensation = {int(c): set(ds) for c, ds in cond.items()}
+            self.graph._scc_id = scc_id
+        self._recipes_index = {sys.intern(k): v for k, v in data.get("recipes_index", {}).items()}
+        self._file_hashes = dict(data.get("file_hashes") or {})
+        self._owners = {p: sys.intern(o) for p, o in (data.get("owners") or {}).items()}
 
-    def _save_cache(self, recipe_files: Iterable[Path]):
+    def _save_cache(self, recipe_files: Iterable[Path], file_hashes: Optional[Dict[str, str]] = None):
         """Persist graph and index plus current hash to disk."""
         try:
             nodes = list(sorted(self.graph.nodes))
-            edges = {n: sorted(list(self.graph.adj.get(n, []))) for n in nodes}
-            meta = self.graph.meta
-            data = {"nodes": nodes, "edges": edges, "meta": meta, "recipes_index": self._recipes_index}
+            pos = {n: i for i, n in enumerate(nodes)}
+            adj = self.graph.adj
+            edge_pairs = [[pos[a], pos[b]] for a in nodes for b in sorted(adj.get(a, ())) if b in pos]
+            self.graph.ensure_condensation()
+            data = {"nodes": nodes, "edge_pairs": edge_pairs, "meta": self.graph.meta, "recipes_index": self._recipes_index,
+                    "scc": [self.graph._scc_id[n] for n in nodes],
+                    "condensation": {str(c): sorted(ds) for c, ds in self.graph._condensation.items()},
+                    "file_hashes": self._file_hashes, "owners": self._owners}
+            alt = _alt_candidates(self.graph.meta)
+            # picks for OR groups depend on what was installed at scan time (see _alt_choices_current)
+            data["alt_installed"] = sorted(self._installed_among(alt)) if alt else []
             tmp = self.cache_file.with_suffix(".tmp")
-            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            tmp.write_bytes(_dump_cache(data))
             tmp.replace(self.cache_file)
             # hash
-            h = self._compute_sources_hash(recipe_files)
+            h = _fold_hashes(file_hashes) if file_hashes is not None else self._compute_sources_hash(recipe_files)
             self.hash_file.write_text(h, encoding="utf-8")
+            self.stat_file.write_text(_stat_list_hash(recipe_files), encoding="utf-8")
             self.logger.debug("Deps cache saved")
         except Exception as e:
             self.logger.warning(f"Failed to save deps cache: {e}")
 
+    def _installed_names(self) -> Set[str]:
+        """Installed package names, queried once per scan."""
+        if self._installed_cache is None:
+            names: Set[str] = set()
+            if self._db:
+                try:
+                    if hasattr(self._db, "installed_names"):
+                        names = set(self._db.installed_names())
+                    else:
+                        names = {r["name"] for r in self._db.list_installed_quick()}
+                except Exception as e:
+                    self.logger.debug(f"Could not list installed packages: {e}")
+            self._installed_cache = names
+        return self._installed_cache
+
+    def _prime_installed(self, parsed: List[Any]) -> None:
+        """
+        Fill the installed cache for this scan with only the OR-group candidates that
+        _choose_alternative will ask about (one batched IN query instead of every package row).
+        """
+        if self._installed_cache is not None or not self._db or not hasattr(self._db, "installed_subset"):
+            return
+        candidates = {c for item in parsed if item for group in item[2] if len(group) > 1 for c in group}
+        if not candidates:
+            return
+        try:
+            self._installed_cache = set(self._db.installed_subset(candidates))
+        except Exception as e:
+            self.logger.debug("Could not query installed alternatives: %s", e)
+
+    def _alt_choices_current(self, data: Dict[str,Any]) -> bool:
+        """
+        Whether the OR-group edges in a cached graph still match what is installed: the picks
+        depend on the installed set, which the recipe hashes do not cover.
+        """
+        candidates = _alt_candidates(data.get("meta") or {})
+        if not candidates:
+            return True
+        stored = data.get("alt_installed")
+        return stored is not None and self._installed_among(candidates) == set(stored)
+
+    def _installed_among(self, candidates: Set[str]) -> Set[str]:
+        """Which of candidates are installed right now (one batched query when the db supports it)."""
+        if not self._db:
+            return set()
+        try:
+            if hasattr(self._db, "installed_subset"):
+                return set(self._db.installed_subset(candidates))
+            return candidates & {r["name"] for r in self._db.list_installed_quick()}
+        except Exception as e:
+            self.logger.debug("Could not query installed alternatives: %s", e)
+            return set()
+
+    def _choose_alternative(self, group: List[str], known: Set[str]) -> str:
+        """One edge per OR group: the first installed alternative, else the first with a recipe, else the first."""
+        installed = self._installed_names()
+        for cand in group:
+            if cand in installed:
+                return cand
+        for cand in group:
+            if cand in known:
+                return cand
+        return group[0]
+
+    def _add_parsed(self, item: Tuple[str, Dict[str,Any], List[List[str]]], known: Set[str]) -> str:
+        """Insert one parsed recipe (name, meta, dependency groups) into the graph; returns the package name."""
+        raw_name, meta, groups = item
+        # intern names: the same strings recur as nodes and as edge targets
+        name = sys.intern(raw_name)
+        meta = dict(meta)
+        choices = []
+        for idx, group in enumerate(groups):
+            if len(group) == 1:
+                chosen = group[0]
+            else:
+                chosen = self._choose_alternative(group, known)
+                choices.append([idx, chosen, [c for c in group if c != chosen]])
+            self.graph.add_edge(name, chosen)
+        if choices:
+            meta["alt_choices"] = choices
+        prev = self._recipes_index.get(name)
+        if prev is not None and prev != meta["recipe"]:
+            # several recipes for one package (gcc-9.toml, gcc-13.toml): the highest version
+            # owns the index entry whatever the path order, not the lexicographically last
+            try:
+                keep_prev = (_cmp_versions(str(self.graph.meta.get(name, {}).get("version")), str(meta.get("version"))) or 0) > 0
+            except Exception:
+                keep_prev = False
+            if keep_prev:
+                # the winner keeps its meta untouched; the edges above are merged as before
+                return name
+        self._recipes_index[name] = meta["recipe"]
+        self.graph.add_node(name, meta)
+        return name
+
+    def _drop_recipe(self, name: str) -> Tuple[str, ...]:
+        """
+        Forget what a recipe contributed: its outgoing edges, meta and index entry.
+        Returns the dependees it pointed at, so recipe-less ones left dangling can be pruned.
+        """
+        dependees = tuple(self.graph.iter_out(name))
+        self.graph.clear_out_edges(name)
+        self.graph.meta.pop(name, None)
+        self._recipes_index.pop(name, None)
+        if not self.graph.iter_in(name):
+            self.graph.remove_node(name)
+        return dependees
+
+    def _apply_recipe_delta(self, file_hashes: Dict[str, str]) -> int:
+        """
+        Bring the loaded graph up to date by re-parsing only added/changed recipes and
+        dropping deleted ones. Returns the number of recipe files re-parsed.
+        """
+        old = self._file_hashes
+        changed = {p for p, h in file_hashes.items() if old.get(p) != h}
+        deleted = {p for p in old if p not in file_hashes}
+        affected = {self._owners[p] for p in changed | deleted if p in self._owners}
+        # recipes sharing a package name with a touched one are re-read so their edges survive the drop
+        reparse = changed | {p for p, o in self._owners.items() if o in affected and p in file_hashes}
+        before = set(self._recipes_index)
+        for p in deleted:
+            self._owners.pop(p, None)
+        count = self._reparse_recipes(affected, reparse)
+        # OR groups also pick by which alternatives have a recipe: a package gaining or losing
+        # its recipe re-picks every group naming it, as a full scan would
+        flipped = before.symmetric_difference(self._recipes_index)
+        if flipped:
+            names = {n for n, m in self.graph.meta.items() if not flipped.isdisjoint(_alt_candidates({n: m}))}
+            # a recipe that lost the version tie keeps no meta: re-read every name with several recipes
+            per_name: Dict[str, int] = defaultdict(int)
+            for o in self._owners.values():
+                per_name[o] += 1
+            names.update(o for o, c in per_name.items() if c > 1)
+            names -= affected
+            if names:
+                count += self._reparse_recipes(names, {p for p, o in self._owners.items() if o in names})
+        self._file_hashes = dict(file_hashes)
+        return count
+
+    def _reparse_recipes(self, names: Set[str], paths: Set[str]) -> int:
+        """Drop what names contributed and re-read paths into the graph; returns how many files were parsed."""
+        orphaned: Set[str] = set()
+        for name in names:
+            orphaned.update(self._drop_recipe(name))
+        todo = sorted(paths)
+        parsed = _parse_recipes(todo, self.max_workers)
+        known = set(self._recipes_index) | {item[0] for item in parsed if item}
+        # each pass primes the installed lookup for its own OR candidates
+        self._installed_cache = None
+        self._prime_installed(parsed)
+        for p, item in zip(todo, parsed):
+            if item is None:
+                self._owners.pop(p, None)
+                continue
+            self._owners[p] = self._add_parsed(item, known)
+        # a dependency without a recipe that nothing points at any more would not exist after a full scan
+        for name in orphaned:
+            if name not in self._recipes_index and name in self.graph.nodes and not self.graph.iter_in(name):
+                self.graph.remove_node(name)
+        return len(todo)
+
+    def _load_cache_data(self) -> bool:
+        """Restore the on-disk cache even if stale (used as the base for an incremental scan)."""
+        try:
+            if not self.cache_file.exists():
+                return False
+            data = _load_cache(self.cache_file.read_bytes())
+            if not self._alt_choices_current(data):
+                # edges chosen for OR groups would mix old and new picks: rebuild instead
+                return False
+            self._restore_from_cache(data)
+            return True
+        except Exception as e:
+            self.logger.debug(f"Failed to load deps cache: {e}")
+            return False
+
     # -------------------------
     # Public: scan recipes and build graph
     # -------------------------
@@ -393,6 +1325,7 @@ class DepsManager:
     def scan_recipes(self, ports_dir: Optional[Path] = None, force: bool = False) -> None:
         """
         Scan recipe files, parse dependencies and build dependency graph.
+        A stale cache is updated incrementally (only added/changed recipes are parsed).
         If force=True, rebuild cache regardless of stored hash.
         """
         with LOCK:
@@ -407,41 +1340,32 @@ class DepsManager:
                     self.logger.debug("Using loaded graph (no force rebuild)")
                     return
 
+            file_hashes = self._recipe_file_hashes(recipe_files)
+            self._installed_cache = None
+            if not force and self._load_cache_data() and self._file_hashes:
+                n = self._apply_recipe_delta(file_hashes)
+                self.logger.debug(f"Deps cache updated incrementally ({n} recipes re-parsed)")
+                self.graph.freeze()
+                self._save_cache(recipe_files, file_hashes)
+                return
+
             # rebuild from scratch
             self.graph = DependencyGraph()
             self._recipes_index = {}
-            for rf in recipe_files:
-                try:
-                    recipe = load_recipe(str(rf))
-                    name = recipe.get("package", {}).get("name") or rf.stem
-                    self._recipes_index[name] = str(rf)
-                    self.graph.add_node(name, {"recipe": str(rf), "version": recipe.get("package", {}).get("version")})
-                    # collect dependencies entries
-                    deps_raw = recipe.get("dependencies") or recipe.get("depends") or []
-                    # allow dictionary keyed dependencies in some recipes
-                    if isinstance(deps_raw, dict):
-                        # convert to list of dicts
-                        deps_parsed = []
-                        for k, v in deps_raw.items():
-                            deps_parsed.append({"name": k, "req": v})
-                        deps_raw = deps_parsed
-                    for d in deps_raw:
-                        alts = _normalize_dep_entry(d)
-                        # each alt group means "this package depends on (one of) list"
-                        # we will add edges to all alternatives to represent potential dependencies (conservative)
-                        for group in alts:
-                            for candidate in group:
-                                if candidate:
-                                    # normalize candidate name (strip version specifiers if any)
-                                    # e.g. "libfoo>=1.2" -> "libfoo"
-                                    cand = candidate.split()[0].split(">=")[0].split("==")[0].split("<=")[0].split("!=")[0]
-                                    cand = cand.strip()
-                                    if cand:
-                                        self.graph.add_edge(name, cand)
-                except Exception as e:
-                    self.logger.debug(f"Failed to parse recipe {rf}: {e}")
+            self._owners = {}
+            # parsing is CPU bound on the TOML/YAML parser: fan out to worker processes,
+            # then mutate the graph on this thread only
+            paths = [str(p) for p in recipe_files]
+            parsed = _parse_recipes(paths, self.max_workers)
+            known = {item[0] for item in parsed if item}
+            self._prime_installed(parsed)
+            for p, item in zip(paths, parsed):
+                if item is not None:
+                    self._owners[p] = self._add_parsed(item, known)
+            self._file_hashes = dict(file_hashes)
+            self.graph.freeze()
             # save cache
-            self._save_cache(recipe_files)
+            self._save_cache(recipe_files, file_hashes)
 
     # -------------------------
     # Resolve dependencies
@@ -453,30 +1377,42 @@ class DepsManager:
             { "ok": bool, "order": [pkg...], "levels": [[...],[...]], "cycles": [...], "missing": [...] }
         """
         with LOCK:
-            requested = set(pkgs)
+            requested = frozenset(pkgs)
+            # unchanged graph + same request set (repeat builds, dry-runs): reuse the last plan
+            res = self._graph_memo("resolve", requested, lambda: self._resolve_uncached(requested))
+            levels = res["levels"]
+            return {"ok": res["ok"], "order": list(res["order"]),
+                    "levels": [list(l) for l in levels] if levels is not None else None,
+                    "cycles": [list(c) for c in res["cycles"]], "missing": list(res["missing"])}
+
+    def _resolve_uncached(self, requested: FrozenSet[str]) -> Dict[str,Any]:
+        with LOCK:
             # check existence in graph
             missing = [p for p in requested if p not in self.graph.nodes]
             if missing:
-                self.logger.debug(f"Missing recipes for: {missing}")
-            # build subset: all nodes reachable from requested (BFS)
-            subset = set()
-            q = deque()
-            for p in requested:
-                if p in self.graph.nodes:
-                    q.append(p)
+                self.logger.debug("Missing recipes for: %s", missing)
+            # build subset: all nodes reachable from requested (BFS). The subset is closed under
+            # dependencies, so each node's pending count for Kahn is simply its out-degree.
+            iter_out = self.graph.iter_out
+            indeg: Dict[str, int] = {}
+            q = deque(p for p in requested if p in self.graph.nodes)
             while q:
                 n = q.popleft()
-                if n in subset:
+                if n in indeg:
                     continue
-                subset.add(n)
-                for dep in self.graph.out_edges(n):
-                    if dep not in subset:
+                deps = iter_out(n)
+                indeg[n] = len(deps)
+                for dep in deps:
+                    if dep not in indeg:
                         q.append(dep)
-            # run topo sort
-            ok, order, levels = self.graph.topo_sort(subset)
+            subset = set(indeg)
+            # Kahn doubles as the cycle check: only an incomplete order needs the
+            # SCC condensation (a whole-graph Tarjan when the graph just changed)
+            ok, order, levels = self.graph.topo_sort(subset, indeg=indeg)
             cycles = []
             if not ok:
-                cycles = self.graph.find_cycles()
+                cycles = self.graph.cycles_in(subset)
+                _, order, levels = self.graph.topo_sort_condensed(subset)
             return {"ok": ok, "order": order, "levels": levels, "cycles": cycles, "missing": missing}
 
     # -------------------------
@@ -496,18 +1432,17 @@ class DepsManager:
                     return {"ok": False, "reason": "cycles", "cycles": res["cycles"]}
             order = res["order"]
             # if builder not present, return planned sequence
-            if not BUILDER_AVAILABLE:
+            builder_cls = _builder_class()
+            if builder_cls is None:
                 return {"ok": True, "dry_run": dry_run, "plan": order}
 
-            builder = builder_ctx or ZeropkgBuilder()
+            builder = builder_ctx or builder_cls()
             results = []
-            # Build in topological order (order is from requested -> dependencies; we need to build dependencies first)
-            # The topo order returned earlier lists nodes in a sequence where dependents appear before dependee in our implementation.
-            # We want to invert so dependees first: simple reverse.
-            build_sequence = list(reversed(order))
+            # topo order already lists dependencies before their dependents
+            build_sequence = order
             for pkg in build_sequence:
                 try:
-                    self.logger.info(f"Building package: {pkg}")
+                    self.logger.info("Building package: %s", pkg)
                     if dry_run:
                         results.append({"pkg": pkg, "status": "planned"})
                         continue
@@ -538,15 +1473,17 @@ class DepsManager:
                 self.logger.warning("DB not available; cannot perform depclean")
                 return {"ok": False, "reason": "no_db"}
             keep_essentials = keep_essentials or set()
-            installed = {r["name"] for r in self._db.list_installed_quick()}
+            if hasattr(self._db, "installed_names"):
+                installed = set(self._db.installed_names())
+            else:
+                installed = {r["name"] for r in self._db.list_installed_quick()}
             # compute all dependee names referenced in dependencies table
             referenced = set()
             # traverse graph edges: if a package is in graph and there is an edge from P->D, D is referenced
-            for a in self.graph.nodes:
-                for d in self.graph.out_edges(a):
-                    referenced.add(d)
+            for targets in self.graph.adj.values():
+                referenced.update(targets)
             # packages that are installed but never referenced are orphans (conservative)
-            orphans = sorted([p for p in installed if p not in referenced and p not in keep_essentials])
+            orphans = sorted(installed.difference(referenced, keep_essentials))
             report = {"installed_count": len(installed), "orphans": orphans}
             if dry_run:
                 return {"ok": True, "dry_run": True, "report": report}
@@ -581,13 +1518,30 @@ class DepsManager:
     # Missing dependencies list (recipes not present)
     # -------------------------
     def missing_dependencies(self) -> List[str]:
-        missing = []
+        def _compute():
+            # add_edge creates a node for every dependee, so "missing" means no recipe defines it
+            index = self._recipes_index
+            return sorted({d for targets in self.graph.adj.values() for d in targets if d not in index})
         with LOCK:
-            for a in sorted(self.graph.nodes):
-                for d in self.graph.out_edges(a):
-                    if d not in self.graph.nodes:
-                        missing.append(d)
-        return sorted(set(missing))
+            return list(self._graph_memo("missing", None, _compute))
+
+    # -------------------------
+    # Memo for graph queries, dropped whenever the graph changes
+    # -------------------------
+    def _graph_memo(self, kind: str, key: Any, compute):
+        if self._memo_graph is not self.graph or self._memo_version != self.graph._version:
+            self._memo = {}
+            self._memo_graph = self.graph
+            self._memo_version = self.graph._version
+        k = (kind, key)
+        try:
+            return self._memo[k]
+        except KeyError:
+            pass
+        if len(self._memo) >= GRAPH_MEMO_MAX:
+            self._memo.clear()
+        value = self._memo[k] = compute()
+        return value
 
     # -------------------------
     # Export graph
@@ -595,15 +1549,20 @@ class DepsManager:
     def export_dot(self, dest: Union[str, Path]) -> Path:
         dest = Path(dest)
         dest.parent.mkdir(parents=True, exist_ok=True)
-        dot = self.graph.to_dot()
-        dest.write_text(dot, encoding="utf-8")
+        # stream through a buffered writer instead of materializing the whole document
+        with open(dest, "w", encoding="utf-8", buffering=1 << 16) as f:
+            self.graph.write_dot(f)
         return dest
 
     def export_json(self, dest: Union[str, Path]) -> Path:
         dest = Path(dest)
         dest.parent.mkdir(parents=True, exist_ok=True)
         data = self.graph.to_json()
-        dest.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        if ORJSON_AVAILABLE:
+            dest.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        else:
+            with open(dest, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
         return dest
 
     # -------------------------
@@ -613,30 +1572,82 @@ class DepsManager:
         with LOCK:
             if pkg_name not in self.graph.nodes:
                 return {"ok": False, "reason": "not_found", "pkg": pkg_name}
-            impacted = set()
-            q = deque([pkg_name])
-            while q:
-                cur = q.popleft()
-                for rev in self.graph.in_edges(cur):
-                    if rev not in impacted:
-                        impacted.add(rev)
-                        q.append(rev)
-            return {"ok": True, "pkg": pkg_name, "impacted_count": len(impacted), "impacted": sorted(list(impacted))}
+            impacted = self._graph_memo("impact", pkg_name, lambda: sorted(self.graph.reverse_closure(pkg_name)))
+            return {"ok": True, "pkg": pkg_name, "impacted_count": len(impacted), "impacted": list(impacted)}
 
     # -------------------------
     # CVE check helper (best-effort)
     # -------------------------
+    def _vuln_manager(self):
+        if self._vuln is None:
+            mod = _vuln_module()
+            self._vuln = mod.ZeroPKGVulnManager() if mod else False
+        return self._vuln or None
+
+    def _vuln_db_stamp(self) -> Optional[str]:
+        db = getattr(self._vuln, "db", None)
+        return str(db.get("generated")) if isinstance(db, dict) else None
+
+    def _load_vuln_cache(self, stamp: Optional[str]) -> Dict[str, Any]:
+        """(pkg, version) -> scan result, valid only for the vuln DB it was computed against."""
+        if self._vuln_cache is None:
+            self._vuln_cache = {}
+            try:
+                if VULN_CACHE_FILE.exists():
+                    data = _load_cache(VULN_CACHE_FILE.read_bytes())
+                    if data.get("stamp") == stamp:
+                        self._vuln_cache = data.get("entries") or {}
+            except Exception as e:
+                self.logger.debug(f"Failed to load vuln cache: {e}")
+        return self._vuln_cache
+
+    def _save_vuln_cache(self, stamp: Optional[str]) -> None:
+        try:
+            tmp = VULN_CACHE_FILE.with_suffix(".tmp")
+            tmp.write_bytes(_dump_cache({"stamp": stamp, "entries": self._vuln_cache or {}}))
+            tmp.replace(VULN_CACHE_FILE)
+        except Exception as e:
+            self.logger.debug(f"Failed to save vuln cache: {e}")
+
     def check_vulns_for_list(self, pkgs: Iterable[str]) -> Dict[str,Any]:
-        if not VULN_AVAILABLE or not self._vuln:
+        """
+        Scan packages at their recipe versions. Results are memoized per (pkg, version) and
+        persisted, so only new or changed recipes reach the vuln backend, in one batch.
+        """
+        if not self._vuln_manager():
             return {"ok": False, "reason": "vuln_module_missing"}
+        pkgs = list(pkgs)
+        stamp = self._vuln_db_stamp()
+        cache = self._load_vuln_cache(stamp)
         res = {}
+        todo = []
         for p in pkgs:
-            try:
-                vulns = self._vuln.vulndb.get_vulns(p) if hasattr(self._vuln, "vulndb") else self._vuln.scan_package(p)
-                res[p] = vulns
-            except Exception as e:
-                res[p] = {"error": str(e)}
-        return {"ok": True, "results": res}
+            ver = (self.graph.meta.get(p) or {}).get("version")
+            key = f"{p}\0{ver}"
+            if ver and key in cache:
+                res[p] = cache[key]
+            else:
+                todo.append((p, ver))
+        if todo:
+            if hasattr(self._vuln, "scan_packages_batch"):
+                try:
+                    batch = self._vuln.scan_packages_batch(todo)
+                except Exception as e:
+                    batch = {p: {"error": str(e)} for p, _ in todo}
+            else:
+                batch = {}
+                for p, ver in todo:
+                    try:
+                        batch[p] = self._vuln.scan_package(p, ver)
+                    except Exception as e:
+                        batch[p] = {"error": str(e)}
+            for p, ver in todo:
+                r = batch.get(p) or {"error": "no result"}
+                res[p] = r
+                if ver and "error" not in r:
+                    cache[f"{p}\0{ver}"] = r
+            self._save_vuln_cache(stamp)
+        return {"ok": True, "results": {p: res[p] for p in pkgs}}
 
     # -------------------------
     # Utility: show planned build groups
@@ -648,6 +1659,40 @@ class DepsManager:
         # levels are groups where each group can be built in parallel
         return {"ok": True, "levels": res["levels"], "plan_len": len(res["order"])}
 
+# -------------------------
+# Module-level helpers (zeropkg_remover, zeropkg_depclean)
+# -------------------------
+_default_manager: Optional[DepsManager] = None
+
+def _manager() -> DepsManager:
+    global _default_manager
+    with LOCK:
+        if _default_manager is None:
+            _default_manager = DepsManager()
+        return _default_manager
+
+def ensure_graph_loaded() -> DependencyGraph:
+    """Shared graph, loaded from the cache or scanned on first use."""
+    dm = _manager()
+    if not dm.graph.nodes:
+        dm.scan_recipes()
+    return dm.graph
+
+def rebuild_cache() -> None:
+    _manager().scan_recipes(force=True)
+
+def find_revdeps(graph: DependencyGraph, package_name: str, deep: bool = False) -> List[str]:
+    """
+    Packages that depend on package_name: direct dependents only, or with deep=True
+    everything that reaches it (one BFS via reverse_closure, each node visited once).
+    """
+    if deep:
+        found = graph.reverse_closure(package_name)
+    else:
+        found = set(graph.iter_in(package_name))
+    found.discard(package_name)
+    return sorted(found)
+
 # -------------------------
 # CLI for quick usage
 # -------------------------
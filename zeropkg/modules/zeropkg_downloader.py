@@ -296,11 +296,8 @@ class Downloader:
             return result
 
         # 2) try protocols/mirrors: prepare list
-        candidates = [url]
-        if mirrors:
-            for m in mirrors:
-                if m and m not in candidates:
-                    candidates.append(m)
+        # order-preserving dedupe of url + mirrors
+        candidates = list(dict.fromkeys([url, *(m for m in (mirrors or ()) if m)]))
 
         last_err = None
         for candidate in candidates:
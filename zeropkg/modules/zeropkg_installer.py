@@ -44,11 +44,12 @@ except Exception:
     logger.setLevel(logging.INFO)
 
 try:
-    from zeropkg_db import ZeroPKGDB, record_install_quick, remove_package_quick
+    from zeropkg_db import ZeroPKGDB, _get_default_db, record_install_quick, remove_package_quick
     DB_AVAILABLE = True
 except Exception:
     DB_AVAILABLE = False
     ZeroPKGDB = None
+    _get_default_db = None
     record_install_quick = None
     remove_package_quick = None
 
@@ -104,6 +105,22 @@ def _ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+def _newest_entry(directory: Path, prefix: str, suffix: str) -> Optional[Path]:
+    """
+    Return the most recently modified file in directory whose name matches prefix*suffix.
+    Single scandir pass with one stat per match; no intermediate list or sort.
+    """
+    # prefix and suffix must not overlap ("pkg-manifest.json" is not "pkg-*-manifest.json")
+    min_len = len(prefix) + len(suffix)
+    try:
+        with os.scandir(directory) as it:
+            newest = max((e for e in it if len(e.name) >= min_len and e.name.startswith(prefix)
+                          and e.name.endswith(suffix) and e.is_file()),
+                         key=lambda e: e.stat().st_mtime, default=None)
+    except OSError:
+        return None
+    return Path(newest.path) if newest else None
+
 def _run_cmd(cmd: List[str], cwd: Optional[str] = None, capture=False) -> Tuple[int, str, str]:
     logger.debug(f"CMD: {' '.join(cmd)} (cwd={cwd})")
     try:
@@ -131,7 +148,9 @@ class ZeropkgInstaller:
         self.require_sandbox = bool(require_sandbox)
         if DB_AVAILABLE:
             try:
-                self.db = ZeroPKGDB()
+                # share the process-wide connection (and manifest cache) that
+                # record_install_quick/remove_package_quick write through
+                self.db = _get_default_db()
             except Exception:
                 self.db = None
         else:
@@ -336,10 +355,10 @@ class ZeropkgInstaller:
         # find manifest: check DB or manifest files under /var/lib/zeropkg
         if manifest is None:
             # attempt to find manifest file
-            man_glob = list((rootp / "var" / "lib" / "zeropkg").glob(f"{pkg_name}-*-manifest.json")) if (rootp / "var" / "lib" / "zeropkg").exists() else []
-            if man_glob:
+            newest_manifest = _newest_entry(rootp / "var" / "lib" / "zeropkg", f"{pkg_name}-", "-manifest.json")
+            if newest_manifest:
                 try:
-                    with open(man_glob[-1], "r", encoding="utf-8") as f:
+                    with open(newest_manifest, "r", encoding="utf-8") as f:
                         manifest = json.load(f)
                 except Exception:
                     manifest = None
@@ -375,11 +394,11 @@ class ZeropkgInstaller:
                 logger.warning(f"Skipping removal outside root: {dst}")
                 continue
             try:
-                if dst.exists():
-                    dst.unlink()
-                    removed.append(str(dst))
-                else:
-                    skipped.append(str(dst))
+                # unlink straight away: one syscall per file instead of stat + unlink
+                dst.unlink()
+                removed.append(str(dst))
+            except FileNotFoundError:
+                skipped.append(str(dst))
             except Exception as e:
                 logger.error(f"Failed to remove {dst}: {e}")
                 errors.append({"file": str(dst), "error": str(e)})
@@ -448,9 +467,7 @@ class ZeropkgInstaller:
         # remove files that were installed
         for p in installed_paths:
             try:
-                pp = Path(p)
-                if pp.exists():
-                    pp.unlink()
+                Path(p).unlink(missing_ok=True)
             except Exception as e:
                 logger.warning(f"Rollback: failed to remove {p}: {e}")
         # restore backups
@@ -59,9 +59,22 @@ except Exception:
     DBManager = None
 
 try:
-    from zeropkg_deps import ensure_graph_loaded, find_revdeps, rebuild_cache
+    from zeropkg_deps import ensure_graph_loaded, find_revdeps
 except Exception:
-    ensure_graph_loaded = find_revdeps = rebuild_cache = None
+    ensure_graph_loaded = find_revdeps = None
+
+def _load_deps_helpers() -> bool:
+    """
+    Reimporta os helpers do zeropkg_deps sob demanda: quando o próprio zeropkg_deps
+    é importado primeiro, ele chega a este módulo ainda incompleto (import circular).
+    """
+    global ensure_graph_loaded, find_revdeps
+    if find_revdeps is None:
+        try:
+            from zeropkg_deps import ensure_graph_loaded, find_revdeps
+        except Exception:
+            return False
+    return True
 
 try:
     from zeropkg_depclean import Depcleaner
@@ -77,8 +90,14 @@ except Exception:
 def _timestamp():
     return int(time.time())
 
+# diretórios já garantidos neste processo (evita mkdir repetido a cada Remover())
+_ENSURED_DIRS: set = set()
+
 def _ensure_dir(path: Path):
-    path.mkdir(parents=True, exist_ok=True)
+    key = str(path)
+    if key not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(key)
     return path
 
 def _create_backup(paths: List[str], dest: Path):
@@ -230,7 +249,7 @@ class Remover:
                 report["backup"] = str(bpath)
 
             dependents = []
-            if with_dependents and find_revdeps:
+            if with_dependents and _load_deps_helpers():
                 dependents = find_revdeps(ensure_graph_loaded(), pkg, deep=True) or []
                 dependents = [d for d in dependents if d != pkg]
 
@@ -239,10 +258,8 @@ class Remover:
 
             ok = self._remove_impl(pkg, dry_run, force)
             report["ok"] = ok
-
-            if rebuild_cache and not dry_run:
-                rebuild_cache()
-
+            # sem rebuild do grafo: remover um pacote não altera nenhuma receita, e a troca de
+            # alternativas instaladas já invalida o cache do deps na próxima carga
             return report
         except Exception as e:
             report["errors"].append(str(e))
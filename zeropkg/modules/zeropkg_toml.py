@@ -15,6 +15,7 @@ Parser/normalizador de receitas TOML para Zeropkg.
 from __future__ import annotations
 import os
 import sys
+import pickle
 import typing as _t
 from pathlib import Path
 
@@ -56,6 +57,27 @@ except Exception:
         # fallback silencioso para não poluir em import
         return
 
+# path -> (mtime_ns, size, pickled raw dict). The same recipe is often read several times
+# per run (deps scan, builder, vuln fix); unpickling is far cheaper than re-parsing TOML
+# and still hands every caller its own dict.
+_RAW_CACHE: _t.Dict[str, _t.Tuple[int, int, bytes]] = {}
+_RAW_CACHE_MAX = 4096
+
+def _load_toml_path(p: Path) -> dict:
+    st = p.stat()
+    key = str(p)
+    hit = _RAW_CACHE.get(key)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return pickle.loads(hit[2])
+    raw = _load_toml_bytes(p.read_bytes())
+    try:
+        if len(_RAW_CACHE) >= _RAW_CACHE_MAX:
+            _RAW_CACHE.clear()
+        _RAW_CACHE[key] = (st.st_mtime_ns, st.st_size, pickle.dumps(raw, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        pass
+    return raw
+
 # -------------------------
 # Data structures
 # -------------------------
@@ -193,10 +215,7 @@ def parse_toml_input(src: _t.Union[bytes, str, Path]) -> dict:
         raw = _load_toml_bytes(src)
         return raw
     if isinstance(src, Path) or (isinstance(src, str) and os.path.exists(src)):
-        p = Path(src)
-        b = p.read_bytes()
-        raw = _load_toml_bytes(b)
-        return raw
+        return _load_toml_path(Path(src))
     if isinstance(src, str):
         # treat as toml text
         raw = _load_toml_bytes(src.encode("utf-8"))
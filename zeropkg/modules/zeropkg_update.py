@@ -28,6 +28,10 @@ import logging
 import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 # try to import requests (preferred)
@@ -37,6 +41,14 @@ try:
 except Exception:
     REQUESTS_AVAILABLE = False
 
+# faster json for the update cache (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 # optional imports from your project
 try:
     from zeropkg_config import load_config
@@ -71,10 +83,11 @@ except Exception:
 
 # optional DB integration
 try:
-    from zeropkg_db import ZeroPKGDB, record_update_event
+    from zeropkg_db import ZeroPKGDB, _get_default_db, record_update_event
     DB_AVAILABLE = True
 except Exception:
     ZeroPKGDB = None
+    _get_default_db = None
     record_update_event = None
     DB_AVAILABLE = False
 
@@ -89,9 +102,10 @@ except Exception:
 
 # toml parser for recipes
 try:
-    from zeropkg_toml import ZeropkgTOML
+    from zeropkg_toml import parse_toml_input
     TOML_AVAILABLE = True
 except Exception:
+    parse_toml_input = None
     TOML_AVAILABLE = False
 
 # helpers
@@ -147,9 +161,21 @@ def http_head(url: str, timeout: int = 10) -> Tuple[int, dict]:
         log.debug(f"http_head failed for {url}: {e}")
         return 0, {}
 
+# version-scraping patterns, compiled once instead of per call
+_VERSION_SEP_RE = re.compile(r'[._\-+]')
+_GITHUB_TAG_RE = re.compile(r'/tag/([^"\']+)"')
+_HTML_VERSION_RE = re.compile(r'v?(\d+(?:\.\d+){1,4})')
+_BASENAME_VERSION_RE = re.compile(r'[-_v]?(\d+(?:\.\d+){1,4})')
+
 # simple version compare using tuple of ints/strings
+# (memoized: the same version strings come back on every check run)
+@lru_cache(maxsize=8192)
 def normalize_version(v: str) -> Tuple:
-    parts = re.split(r'[._\-+]', v)
+    # common case: dotted, all-numeric ("6.6.12") needs no regex split
+    parts = v.split(".")
+    if all(p.isdecimal() for p in parts):
+        return tuple(map(int, parts))
+    parts = _VERSION_SEP_RE.split(v)
     norm = []
     for p in parts:
         if p.isdigit():
@@ -159,6 +185,7 @@ def normalize_version(v: str) -> Tuple:
             norm.append(p.lower())
     return tuple(norm)
 
+@lru_cache(maxsize=8192)
 def version_greater(a: Optional[str], b: Optional[str]) -> bool:
     if a is None: return False
     if b is None: return True
@@ -194,6 +221,8 @@ def load_cache() -> Dict[str, Any]:
     if not UPDATE_CACHE_PATH.exists():
         return {}
     try:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(UPDATE_CACHE_PATH.read_bytes())
         with open(UPDATE_CACHE_PATH, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception as e:
@@ -203,8 +232,12 @@ def load_cache() -> Dict[str, Any]:
 def save_cache(data: Dict[str,Any]):
     try:
         tmp = UPDATE_CACHE_PATH.with_suffix(".tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        if ORJSON_AVAILABLE:
+            raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            raw = json.dumps(data, indent=2).encode("utf-8")
+        with open(tmp, "wb") as f:
+            f.write(raw)
             f.flush(); os.fsync(f.fileno())
         tmp.replace(UPDATE_CACHE_PATH)
     except Exception as e:
@@ -224,34 +257,68 @@ def record_history_db(pkg: str, old: Optional[str], new: Optional[str], severity
     return False
 
 # recipe scanning helpers
+def _iter_toml(root: Path):
+    """Yield every *.toml file under root (scandir walk, symlinks not followed)."""
+    return _iter_files(root, ".toml")
+
+def _iter_files(root: Path, suffix: str = ""):
+    """Yield every file under root ending in suffix (scandir walk, symlinks not followed)."""
+    pending = deque([str(root)])
+    while pending:
+        d = pending.popleft()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False):
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            log.debug("collect_ports_meta cannot list %s: %s", d, e)
+
+def _parse_port_toml(p: Path) -> Optional[Dict[str,Any]]:
+    """Parse one recipe toml into {name, path, meta}; None if it can't be read."""
+    try:
+        meta = {}
+        if TOML_AVAILABLE:
+            try:
+                # raw table layout ([package] ...), which _probe_for_recipe reads
+                meta = parse_toml_input(p)
+            except Exception:
+                with open(p, "r", encoding="utf-8") as f:
+                    meta = {"raw": f.read()}
+        else:
+            # minimal metadata: read filename and optionally parse name/version
+            fname = p.stem
+            meta = {"package": {"name": fname}}
+        name = meta.get("package", {}).get("name") or p.stem
+        return {"name": name, "path": str(p), "meta": meta}
+    except Exception as e:
+        log.debug("collect_ports_meta skip %s: %s", p, e)
+        return None
+
 def collect_ports_meta(ports_dir: Path = PORTS_DIR) -> List[Dict[str,Any]]:
     """
     Walk the ports tree and gather metadata from recipe toml files.
     Expected layout: ports/<category>/<pkg>/<pkg>-<version>.toml OR <pkg>.toml
     Returns list of dicts {name, path, meta}
+    Files are read and parsed on a thread pool; results keep the walk order.
     """
     recipes = []
     if not ports_dir.exists():
         log.warning(f"ports dir {ports_dir} not found")
         return recipes
-    for p in ports_dir.rglob("*.toml"):
-        try:
-            meta = {}
-            if TOML_AVAILABLE:
-                t = ZeropkgTOML()
-                try:
-                    meta = t.load(p)
-                except Exception:
-                    with open(p, "r", encoding="utf-8") as f:
-                        meta = {"raw": f.read()}
-            else:
-                # minimal metadata: read filename and optionally parse name/version
-                fname = p.stem
-                meta = {"package": {"name": fname}}
-            name = meta.get("package", {}).get("name") or p.stem
-            recipes.append({"name": name, "path": str(p), "meta": meta})
-        except Exception as e:
-            log.debug(f"collect_ports_meta skip {p}: {e}")
+    paths = [Path(f) for f in _iter_toml(ports_dir)]
+    if not paths:
+        return recipes
+    workers = min(32, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for r in ex.map(_parse_port_toml, paths):
+            if r is not None:
+                recipes.append(r)
     return recipes
 
 # upstream probing strategies
@@ -280,7 +347,7 @@ def probe_github_latest(repo_url: str) -> Optional[str]:
         sc, txt = http_get(url_rl, timeout=10)
         # requests will follow redirect; 'txt' may be HTML containing tag in meta
         # attempt to parse out latest tag from canonical link
-        m = re.search(r'/tag/([^"\']+)"', txt)
+        m = _GITHUB_TAG_RE.search(txt)
         if m:
             return m.group(1)
     except Exception as e:
@@ -318,7 +385,7 @@ def probe_html_index_for_version(url: str, regex_hint: Optional[str] = None) ->
             if m:
                 return m.group(1) if m.groups() else m.group(0)
         # common patterns: '-X.Y.Z' near the filename or 'vX.Y.Z'
-        m = re.search(r'v?(\d+(?:\.\d+){1,4})', txt)
+        m = _HTML_VERSION_RE.search(txt)
         if m:
             return m.group(1)
     except Exception as e:
@@ -333,7 +400,7 @@ def probe_downloads_for_version(distfiles: List[str], regex_hint: Optional[str]
         try:
             bn = os.path.basename(urlparse(u).path)
             # common pattern: name-1.2.3.tar.xz
-            m = re.search(r'[-_v]?(\d+(?:\.\d+){1,4})', bn)
+            m = _BASENAME_VERSION_RE.search(bn)
             if m:
                 return m.group(1)
         except Exception:
@@ -365,6 +432,8 @@ def score_severity(old: Optional[str], new: Optional[str], changelog_text: Optio
         pass
     return "normal"
 
+_DISTFILE_VERSION_RE = re.compile(r'(\d+(?:\.\d+){1,4})')
+
 # main update logic
 class ZeropkgUpdate:
     def __init__(self, cfg_path: Optional[str] = None):
@@ -376,6 +445,20 @@ class ZeropkgUpdate:
         self.update_cfg = self.cfg.get("update", DEFAULT_UPDATE_CFG)
         self.cache = load_cache()
         self.vuln = ZeroPKGVulnManager() if VULN_AVAILABLE else None
+        # sorted distfile names, walked once per check_updates run
+        self._distfile_names: Optional[List[str]] = None
+
+    def _distfiles_matching(self, distfiles_dir: Path, name: str) -> List[str]:
+        """Distfile names starting with name (bisect over an index built on first use)."""
+        if self._distfile_names is None:
+            self._distfile_names = sorted(os.path.basename(f) for f in _iter_files(distfiles_dir))
+        names = self._distfile_names
+        out = []
+        i = bisect_left(names, name)
+        while i < len(names) and names[i].startswith(name):
+            out.append(names[i])
+            i += 1
+        return out
 
     def save_state_reports(self, updates: List[Dict[str,Any]]):
         # write full JSON
@@ -460,14 +543,14 @@ class ZeropkgUpdate:
                 if v:
                     return {"name": name, "old_version": meta.get("package",{}).get("version"), "new_version": v, "method": "homepage-index"}
             except Exception as e:
-                log.debug(f"probe_for_recipe candidate {url} failed: {e}")
+                log.debug("probe_for_recipe candidate %s failed: %s", url, e)
                 continue
 
         # 3) fallback: check distfiles directory for matching filenames in configured distfiles path
         distfiles_dir = Path(self.cfg.get("paths", {}).get("distfiles", "/usr/ports/distfiles"))
         if distfiles_dir.exists():
-            for f in distfiles_dir.rglob(f"{name}*"):
-                m = re.search(r'(\d+(?:\.\d+){1,4})', f.name)
+            for fname in self._distfiles_matching(distfiles_dir, name):
+                m = _DISTFILE_VERSION_RE.search(fname)
                 if m:
                     return {"name": name, "old_version": meta.get("package",{}).get("version"), "new_version": m.group(1), "method": "local-distfile"}
         return None
@@ -481,6 +564,7 @@ class ZeropkgUpdate:
          - produce list of updates (with severity)
         """
         recipes = collect_ports_meta(self.ports_dir)
+        self._distfile_names = None
         if packages:
             recipes = [r for r in recipes if r.get("name") in packages]
         if repos:
@@ -501,12 +585,12 @@ class ZeropkgUpdate:
                 last_checked = cached.get("checked_at", 0)
                 # if recently checked and not force, skip
                 if not force and (time.time() - last_checked) < (CHECK_INTERVAL_HOURS * 3600):
-                    log.debug(f"Skipping {name} (checked recently)")
+                    log.debug("Skipping %s (checked recently)", name)
                     continue
 
                 pr = self._probe_for_recipe(recipe)
                 if not pr:
-                    log.debug(f"No upstream info for {name}")
+                    log.debug("No upstream info for %s", name)
                     cache[name] = {"checked_at": int(time.time()), "no_info": True}
                     continue
 
@@ -572,7 +656,7 @@ class ZeropkgUpdate:
                 # update cache with latest check
                 cache[name] = {"checked_at": int(time.time()), "last_known_version": str(pr.get("new_version") or "")}
             except Exception as e:
-                log.debug(f"check recipe {recipe.get('name')} failed: {e}")
+                log.debug("check recipe %s failed: %s", recipe.get('name'), e)
                 continue
 
         # persist cache and produce report
@@ -682,7 +766,7 @@ def _cli():
     if args.history:
         if DB_AVAILABLE:
             try:
-                db = ZeroPKGDB()
+                db = _get_default_db()
                 rows = getattr(db, "list_update_history", lambda: [])()
                 print(json.dumps(rows, indent=2))
             except Exception as e:
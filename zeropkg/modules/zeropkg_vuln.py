@@ -25,7 +25,10 @@ import shutil
 import logging
 import tempfile
 import argparse
+import re
+import operator
 from typing import Optional, List, Dict, Any, Tuple
+from functools import lru_cache
 from pathlib import Path
 
 # -------- Safe imports of project modules (graceful fallback) -------
@@ -96,37 +99,121 @@ def _read_json(path: Path) -> Optional[Dict[str,Any]]:
         return None
 
 # -------- Minimal version compare helper (uses packaging if available) ---
+_pkg_version = safe_import("packaging.version")
+
+def _version_key(v: str) -> Tuple:
+    """
+    Chave de ordenação para versões que o packaging não entende (ex: "2.38-rc1", "1.0a").
+    Segmentos numéricos comparam como inteiros, alfabéticos como texto e
+    ficam abaixo do fim da versão (1.0rc1 < 1.0 < 1.0.1).
+    """
+    parts = str(v).split(".")
+    if all(p.isdecimal() for p in parts):
+        # caso comum, só dígitos e pontos: dispensa o laço caractere a caractere
+        return tuple((2, int(p)) for p in parts) + ((1, 0),)
+    key = []
+    num = None
+    word = ""
+    for c in str(v).lower():
+        if c.isdigit():
+            if word:
+                key.append((0, word)); word = ""
+            num = (num or 0) * 10 + int(c)
+        elif c.isalpha():
+            if num is not None:
+                key.append((2, num)); num = None
+            word += c
+        else:
+            if num is not None:
+                key.append((2, num)); num = None
+            if word:
+                key.append((0, word)); word = ""
+    if num is not None:
+        key.append((2, num))
+    if word:
+        key.append((0, word))
+    key.append((1, 0))
+    return tuple(key)
+
+@lru_cache(maxsize=4096)
+def _parse_version(v: str) -> Tuple[Any, Tuple]:
+    """Parse único por string de versão: (packaging.Version ou None, chave fallback)."""
+    parsed = None
+    if _pkg_version:
+        try:
+            parsed = _pkg_version.Version(v)
+        except Exception:
+            parsed = None
+    return parsed, _version_key(v)
+
+_NUMERIC_VERSION_RE = re.compile(r"^\d+(?:\.\d+){0,3}$")
+
+@lru_cache(maxsize=8192)
+def _pack_version(v: str) -> Optional[int]:
+    """
+    Versões puramente numéricas com até 4 componentes (< 65536 cada) viram um
+    inteiro de 64 bits (major<<48 | minor<<32 | patch<<16 | extra); o resto -> None.
+    A ordem dos inteiros é a mesma do packaging ("1.2" == "1.2.0").
+    """
+    if not _NUMERIC_VERSION_RE.match(v):
+        return None
+    packed = 0
+    parts = v.split(".")
+    for i in range(4):
+        n = int(parts[i]) if i < len(parts) else 0
+        if n > 0xFFFF:
+            return None
+        packed = (packed << 16) | n
+    return packed
+
 def _cmp_versions(v1: str, v2: str) -> int:
     """
     retorna -1,0,1 se v1 < v2, v1 == v2, v1 > v2 (melhor esforço).
-    usa packaging.version se disponível, fallback string compare.
+    caminho rápido: inteiros empacotados (_pack_version) quando ambas são numéricas;
+    senão usa packaging.version se ambas as versões forem válidas, ou a chave fallback.
     """
-    try:
-        pv = safe_import("packaging.version")
-        if pv:
-            a = pv.version.parse(v1)
-            b = pv.version.parse(v2)
-            if a < b: return -1
-            if a > b: return 1
-            return 0
-    except Exception:
-        pass
-    # fallback: split numeric-ish parts
-    try:
-        def Norm(s):
-            parts = []
-            for p in str(s).replace('-', '.').split('.'):
-                try:
-                    parts.append(int(p))
-                except Exception:
-                    parts.append(p)
-            return parts
-        a = Norm(v1); b = Norm(v2)
-        if a < b: return -1
-        if a > b: return 1
-        return 0
-    except Exception:
+    if v1 == v2:
         return 0
+    a = _pack_version(str(v1))
+    b = _pack_version(str(v2))
+    if a is not None and b is not None:
+        return (a > b) - (a < b)
+    p1, k1 = _parse_version(str(v1))
+    p2, k2 = _parse_version(str(v2))
+    if p1 is not None and p2 is not None:
+        a, b = p1, p2
+    else:
+        a, b = k1, k2
+    if a < b: return -1
+    if a > b: return 1
+    return 0
+
+# operadores de faixa "affected" -> comparação do resultado de _cmp_versions com 0
+_RANGE_OPS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+
+def _split_range_token(t: str) -> Tuple[Optional[str], str]:
+    """Separa "<=1.2" em ("<=", "1.2"); operadores de 2 chars têm prioridade."""
+    op = t[:2] if t[:2] in _RANGE_OPS else t[:1] if t[:1] in _RANGE_OPS else None
+    return op, (t[len(op):] if op else t)
+
+@lru_cache(maxsize=4096)
+def _parse_affected(affected: str) -> Tuple[Tuple[Any, str], ...]:
+    """
+    Faixa "affected" pré-processada uma vez por string: ((comparador ou None, versão), ...).
+    As mesmas faixas se repetem a cada scan; só a comparação fica no caminho quente.
+    """
+    out = []
+    for t in affected.replace(' ', '').split(','):
+        op, v = _split_range_token(t)
+        out.append((_RANGE_OPS[op] if op else None, v))
+    return tuple(out)
 
 # -------- Vulnerability DB format expected (best-effort) -------------
 # Exemplo simples esperado (vulndb.json):
@@ -304,33 +391,14 @@ class ZeroPKGVulnManager:
                         # try to parse: if affected contains "<X" and installed_version < X -> vulnerable
                         try:
                             # handle patterns like "<1.2.3"
-                            tokens = affected.replace(' ', '').split(',')
                             vulnerable = False
-                            for t in tokens:
-                                if t.startswith('<'):
-                                    v = t[1:]
-                                    if _cmp_versions(installed_version, v) < 0:
-                                        vulnerable = True
-                                elif t.startswith('<='):
-                                    v = t[2:]
-                                    if _cmp_versions(installed_version, v) <= 0:
-                                        vulnerable = True
-                                elif t.startswith('>'):
-                                    v = t[1:]
-                                    if _cmp_versions(installed_version, v) > 0:
-                                        vulnerable = True
-                                elif t.startswith('>='):
-                                    v = t[2:]
-                                    if _cmp_versions(installed_version, v) >= 0:
-                                        vulnerable = True
-                                elif t.startswith('=') or '==' in t:
-                                    v = t.replace('=', '').replace('==', '')
-                                    if _cmp_versions(installed_version, v) == 0:
-                                        vulnerable = True
-                                else:
+                            for cmp_op, v in _parse_affected(affected):
+                                if cmp_op is None:
                                     # fallback substring match
-                                    if v in installed_version:
+                                    if v and v in installed_version:
                                         vulnerable = True
+                                elif cmp_op(_cmp_versions(installed_version, v), 0):
+                                    vulnerable = True
                             if vulnerable:
                                 matches.append({"entry": e, "installed_version": installed_version})
                         except Exception:
@@ -352,6 +420,24 @@ class ZeroPKGVulnManager:
         ok = len(matches) == 0
         return {"pkg": pkg, "installed_version": installed_version, "vulns": matches, "ok": ok}
 
+    def scan_packages_batch(self, pkgs: List[Tuple[str, Optional[str]]]) -> Dict[str,Dict[str,Any]]:
+        """
+        Escaneia vários pacotes de uma vez: [(nome, versão|None), ...] -> {nome: resultado de scan_package}.
+        Versões ausentes são buscadas na DB numa única consulta em vez de uma por pacote.
+        """
+        missing = [name for name, ver in pkgs if not ver]
+        installed = {}
+        if missing:
+            try:
+                if db_mod and hasattr(db_mod, "get_packages_many"):
+                    installed = {n: r.get("version") for n, r in db_mod.get_packages_many(missing).items()}
+            except Exception:
+                installed = {}
+        out = {}
+        for name, ver in pkgs:
+            out[name] = self.scan_package(name, ver or installed.get(name))
+        return out
+
     def scan_all(self, *, severity: str = "ALL", dry_run: bool = True) -> Dict[str,Any]:
         """
         Escaneia todos os pacotes instalados e retorna relatório.
@@ -472,25 +558,26 @@ class ZeroPKGVulnManager:
             _safe_write(js_path, scan_report)
         except Exception as e:
             log.warning(f"failed to write JSON report: {e}")
-        # minimal HTML generation
+        # minimal HTML generation, streamed straight to the file
         try:
-            lines = []
-            lines.append("<!doctype html><html><head><meta charset='utf-8'><title>Vuln Report</title></head><body>")
-            lines.append(f"<h1>Vulnerability report — {scan_report.get('ts')}</h1>")
-            lines.append(f"<p>Packages affected: {scan_report.get('summary', {}).get('packages_affected', 0)}, total vulns: {scan_report.get('summary', {}).get('total_vulns', 0)}</p>")
-            lines.append("<table border='1' cellpadding='4'><thead><tr><th>Package</th><th>Installed</th><th>CVE</th><th>Severity</th><th>Fixed in</th><th>Description</th></tr></thead><tbody>")
-            for r in scan_report.get("results", []):
-                pkg = r.get("pkg")
-                inst = r.get("installed_version") or "-"
-                for m in r.get("vulns", []):
-                    e = m.get("entry", {})
-                    cve = e.get("cve") or e.get("id") or "-"
-                    sev = e.get("severity") or "-"
-                    fixed = e.get("fixed_in") or "-"
-                    desc = (e.get("description") or "")[:200]
-                    lines.append(f"<tr><td>{pkg}</td><td>{inst}</td><td>{cve}</td><td>{sev}</td><td>{fixed}</td><td>{desc}</td></tr>")
-            lines.append("</tbody></table></body></html>")
-            html_path.write_text("\n".join(lines), encoding="utf-8")
+            summary = scan_report.get("summary", {})
+            with open(html_path, "w", encoding="utf-8", buffering=1 << 16) as fh:
+                w = fh.write
+                w("<!doctype html><html><head><meta charset='utf-8'><title>Vuln Report</title></head><body>")
+                w(f"\n<h1>Vulnerability report — {scan_report.get('ts')}</h1>")
+                w(f"\n<p>Packages affected: {summary.get('packages_affected', 0)}, total vulns: {summary.get('total_vulns', 0)}</p>")
+                w("\n<table border='1' cellpadding='4'><thead><tr><th>Package</th><th>Installed</th><th>CVE</th><th>Severity</th><th>Fixed in</th><th>Description</th></tr></thead><tbody>")
+                for r in scan_report.get("results", []):
+                    pkg = r.get("pkg")
+                    inst = r.get("installed_version") or "-"
+                    for m in r.get("vulns", []):
+                        e = m.get("entry", {})
+                        cve = e.get("cve") or e.get("id") or "-"
+                        sev = e.get("severity") or "-"
+                        fixed = e.get("fixed_in") or "-"
+                        desc = (e.get("description") or "")[:200]
+                        w(f"\n<tr><td>{pkg}</td><td>{inst}</td><td>{cve}</td><td>{sev}</td><td>{fixed}</td><td>{desc}</td></tr>")
+                w("\n</tbody></table></body></html>")
         except Exception as e:
             log.warning(f"failed to write HTML report: {e}")
         return {"json": str(js_path), "html": str(html_path)}